@@ -0,0 +1,243 @@
+""" JSON API, mounted at /api/v1.
+
+    GET /api/v1/<venues|artists|shows>         one keyset page
+    GET /api/v1/<venues|artists|shows>/export  every row as NDJSON
+    GET /api/v1/<venues|artists>/facets        counts per genre
+    POST /api/v1/<venues|artists>/delete       bulk delete, body {"ids": [...]}
+    PATCH /api/v1/<venues|artists>/<id>        partial update, see edits.py
+
+Query parameters:
+    fields=id,name                 columns to return (default: all)
+    after=, before=, per_page=     keyset pagination, as on the HTML listings
+    city=, state=, genre=          venues and artists
+    venue_id=, artist_id=, from=, to=   shows (from/to are ISO datetimes)
+    genre=&genre=, match=all|any, state=    facets, as on the HTML listings
+
+A bulk delete is one DELETE statement (see deletes.py) and answers with
+counts, e.g. {"deleted": {"venues": 2, "shows": 57}, "missing": [9]}.
+
+A PATCH body names the version it was read at and the form fields to
+change, e.g. {"version": 3, "phone": "123-456-7890"}. It is one UPDATE of
+those columns, answered with the new version, or 409 with the current
+version when someone else edited the entity since.
+"""
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from flask import (
+    Blueprint, Response, abort, current_app, jsonify, request,
+    stream_with_context)
+
+from deletes import delete_entities, invalidate_deleted
+from edits import (
+    FIELDS, RULES, EditConflict, column_values, invalidate_edited, save_edit)
+from models import db, Venue, Artist, Show
+from queries import browse_args, genre_facets, keyset_page
+
+api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+# Rows are streamed from a server-side cursor in batches of this size.
+EXPORT_BATCH_SIZE = 1000
+
+Resource = namedtuple("Resource", ["fields", "sort", "filters", "joins"])
+ENTITIES = {"venues": Venue, "artists": Artist}
+
+
+def columns(*cols):
+    return {c.key: c for c in cols}
+
+
+def entity_filters(model):
+    return {
+        "city": lambda value: model.city == value,
+        "state": lambda value: model.state == value,
+        "genre": lambda value: model.genres.contains([value]),
+    }
+
+
+def parse_datetime(value):
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        abort(400, f"Invalid datetime: {value}")
+    # Show times are local, without a UTC offset.
+    if parsed.tzinfo is not None:
+        abort(400, f"Datetime with a UTC offset: {value}")
+    return parsed
+
+
+def parse_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        abort(400, f"Invalid id: {value}")
+
+
+RESOURCES = {
+    "venues": Resource(
+        fields=columns(
+            Venue.id, Venue.name, Venue.city, Venue.state, Venue.address,
+            Venue.phone, Venue.image_link, Venue.facebook_link, Venue.website,
+            Venue.genres, Venue.seeking_talent, Venue.seeking_description,
+            Venue.upcoming_shows_count, Venue.past_shows_count,
+            Venue.next_show_time, Venue.updated_at,
+        ),
+        sort=[Venue.id],
+        filters=entity_filters(Venue),
+        joins=(),
+    ),
+    "artists": Resource(
+        fields=columns(
+            Artist.id, Artist.name, Artist.city, Artist.state, Artist.phone,
+            Artist.image_link, Artist.facebook_link, Artist.website,
+            Artist.genres, Artist.seeking_venue, Artist.seeking_description,
+            Artist.upcoming_shows_count, Artist.past_shows_count,
+            Artist.next_show_time, Artist.updated_at,
+        ),
+        sort=[Artist.id],
+        filters=entity_filters(Artist),
+        joins=(),
+    ),
+    "shows": Resource(
+        fields=columns(
+            Show.id, Show.start_time, Show.venue_id,
+            Venue.name.label("venue_name"), Show.artist_id,
+            Artist.name.label("artist_name"),
+            Artist.image_link.label("artist_image_link"), Show.updated_at,
+        ),
+        sort=[Show.start_time, Show.id],
+        filters={
+            "venue_id": lambda value: Show.venue_id == parse_int(value),
+            "artist_id": lambda value: Show.artist_id == parse_int(value),
+            "from": lambda value: Show.start_time >= parse_datetime(value),
+            "to": lambda value: Show.start_time < parse_datetime(value),
+        },
+        joins=((Venue, Show.venue_id == Venue.id),
+               (Artist, Show.artist_id == Artist.id)),
+    ),
+}
+
+
+def resource_query(name):
+    """ The filtered, projected query for a resource and the field names to
+    return, from the request's query string."""
+    resource = RESOURCES.get(name) or abort(404)
+    fields = request.args.get("fields")
+    fields = fields.split(",") if fields else list(resource.fields)
+    unknown = [f for f in fields if f not in resource.fields]
+    if unknown:
+        abort(400, f"Unknown fields: {', '.join(unknown)}")
+
+    # The sort key is always selected, the cursors are built from it.
+    selected = dict.fromkeys(fields + [c.key for c in resource.sort])
+    query = db.session.query(*[resource.fields[f] for f in selected])
+    for target, onclause in resource.joins:
+        query = query.join(target, onclause)
+    for arg, criterion in resource.filters.items():
+        value = request.args.get(arg)
+        if value:
+            query = query.filter(criterion(value))
+    return resource, query, fields
+
+
+def serialize(row, fields):
+    return {f: (v.isoformat() if isinstance(v, datetime) else v)
+            for f, v in ((f, getattr(row, f)) for f in fields)}
+
+
+@api.errorhandler(400)
+@api.errorhandler(404)
+def json_error(error):
+    return jsonify({"error": error.description}), error.code
+
+
+@api.route("/<resource>")
+def listing(resource):
+    resource, query, fields = resource_query(resource)
+    try:
+        page = keyset_page(
+            query, resource.sort,
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            per_page=request.args.get("per_page", type=int),
+        )
+    except ValueError as e:
+        abort(400, str(e))
+    return jsonify({
+        "data": [serialize(row, fields) for row in page.items],
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
+    })
+
+
+@api.route("/<resource>/export")
+def export(resource):
+    resource, query, fields = resource_query(resource)
+    rows = query.order_by(*resource.sort).yield_per(EXPORT_BATCH_SIZE)
+
+    def generate():
+        for row in rows:
+            yield json.dumps(serialize(row, fields)) + "\n"
+
+    return Response(stream_with_context(generate()),
+                    mimetype="application/x-ndjson")
+
+
+@api.route("/<resource>/facets")
+def facets(resource):
+    model = ENTITIES.get(resource) or abort(404)
+    try:
+        counts = genre_facets(model, **browse_args(request.args))
+    except ValueError as e:
+        abort(400, str(e))
+    return jsonify({"genres": counts})
+
+
+@api.route("/<resource>/delete", methods=["POST"])
+def bulk_delete(resource):
+    model = ENTITIES.get(resource) or abort(404)
+    ids = (request.get_json(silent=True) or {}).get("ids")
+    if (not isinstance(ids, list) or not ids
+            or not all(type(id) is int for id in ids)):
+        abort(400, "Expected a JSON body {\"ids\": [<int>, ...]}")
+    limit = current_app.config["BULK_DELETE_LIMIT"]
+    if len(ids) > limit:
+        abort(400, f"At most {limit} ids per request")
+    deleted = delete_entities(model, ids)
+    db.session.commit()
+    invalidate_deleted(model, deleted)
+    return jsonify({
+        "deleted": {resource: len(deleted.ids), "shows": deleted.shows},
+        "missing": sorted(set(ids) - set(deleted.ids)),
+    })
+
+
+@api.route("/<resource>/<int:entity_id>", methods=["PATCH"])
+def patch(resource, entity_id):
+    model = ENTITIES.get(resource) or abort(404)
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or type(body.get("version")) is not int:
+        abort(400, "Expected a JSON body {\"version\": <int>, <field>: <value>, ...}")
+    fields = {field: value for field, value in body.items() if field != "version"}
+    unknown = [field for field in fields if field not in FIELDS[model]]
+    if unknown:
+        abort(400, f"Unknown fields: {', '.join(unknown)}")
+    if not fields:
+        abort(400, "No fields to update")
+    _, errors = RULES[model].validate(fields)
+    errors = {field: messages for field, messages in errors.items()
+              if field in fields}
+    if errors:
+        return jsonify({"error": "Invalid fields", "fields": errors}), 400
+    try:
+        edited = save_edit(model, entity_id, body["version"],
+                           column_values(model, fields))
+    except LookupError as e:
+        abort(404, str(e))
+    except EditConflict as conflict:
+        return jsonify({"error": str(conflict), "version": conflict.version}), 409
+    db.session.commit()
+    invalidate_edited(model, entity_id, edited)
+    return jsonify({"id": entity_id, "version": edited.version,
+                    "updated": sorted(fields)})
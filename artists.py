@@ -0,0 +1,134 @@
+""" Artist pages: listing, search, detail, create, edit and delete."""
+from flask import Blueprint, abort, flash, render_template, request
+
+from cache import page_cache
+from conditional import conditional
+from dto import detail, detail_row
+from edits import edit_row
+from models import db, Venue, Artist, Show
+from queries import (
+    artist_listing,
+    browse_args,
+    entity_version,
+    show_counts,
+    show_history,
+)
+from search import search
+from views import delete_entity, flash_errors, paginate, render_search, submit_edit
+
+artist_pages = Blueprint("artists", __name__)
+
+
+@artist_pages.route("/artists")
+@conditional(lambda: paginate(artist_listing, version=True, **browse_args(request.args)))
+@page_cache.cached("artists")
+def artists():
+    page = paginate(artist_listing, **browse_args(request.args))
+    return render_artists(page)
+
+
+def render_artists(page):
+    return render_template("pages/artists.html", artists=page.items, page=page)
+
+
+@artist_pages.route("/artists/search", methods=["POST"])
+def search_artists():
+    search_term = request.form.get("search_term", "")
+    return render_search("pages/search_artists.html", search_term,
+                         search(Artist, search_term))
+
+
+@artist_pages.route("/artists/<int:artist_id>")
+@conditional(lambda artist_id: entity_version(Artist, artist_id))
+@page_cache.cached("artist:{artist_id}")
+def show_artist(artist_id):
+    # shows the artist page with the given artist_id
+    artist = detail_row(Artist, artist_id)
+    if artist is None:
+        abort(404)
+
+    upcoming_page = paginate(show_history, "upcoming_", fk=Show.artist_id,
+                             entity_id=artist_id, counterpart=Venue, upcoming=True)
+    past_page = paginate(show_history, "past_", fk=Show.artist_id,
+                         entity_id=artist_id, counterpart=Venue, upcoming=False)
+    counts = show_counts(Show.artist_id, artist_id)
+    return render_artist(artist, upcoming_page, past_page, counts)
+
+
+def render_artist(artist, upcoming_page, past_page, counts):
+    data = detail(Artist, artist, upcoming_page, past_page, counts)
+    return render_template("pages/show_artist.html", artist=data,
+                           upcoming_page=upcoming_page, past_page=past_page)
+
+
+@artist_pages.route("/artists/<int:artist_id>", methods=["DELETE"])
+def delete_artist(artist_id):
+    return delete_entity(Artist, artist_id)
+
+# 	Update
+# 	----------------------------------------------------------------
+
+
+@artist_pages.route("/artists/<int:artist_id>/edit", methods=["GET"])
+def edit_artist(artist_id):
+    # WTForms is imported by the form pages only.
+    from forms import ArtistForm
+    artist = edit_row(Artist, artist_id)
+    if artist is None:
+        abort(404)
+    form = ArtistForm(obj=artist)
+    return render_template("forms/edit_artist.html", form=form, artist=artist)
+
+
+@artist_pages.route("/artists/<int:artist_id>/edit", methods=["POST"])
+def edit_artist_submission(artist_id):
+    from forms import ArtistForm
+    form = ArtistForm(request.form, meta={'csrf': False})
+    return submit_edit(Artist, artist_id, form)
+
+# 	Create Artist
+# 	----------------------------------------------------------------
+
+
+@artist_pages.route("/artists/create", methods=["GET"])
+def create_artist_form():
+    from forms import ArtistForm
+    form = ArtistForm()
+    return render_template("forms/new_artist.html", form=form)
+
+
+@artist_pages.route("/artists/create", methods=["POST"])
+def create_artist_submission():
+    from forms import ArtistForm
+    # Set the FlaskForm
+    form = ArtistForm(request.form, meta={'csrf': False})
+    # Validate all fields
+    if form.validate():
+        try:
+            artist = Artist(
+                name=form.name.data,
+                city=form.city.data,
+                state=form.state.data,
+                phone=form.phone.data,
+                genres=form.genres.data,
+                facebook_link=form.facebook_link.data,
+                image_link=form.image_link.data,
+                website=form.website_link.data,
+                seeking_venue=form.seeking_venue.data,
+                seeking_description=form.seeking_description.data,
+            )
+            db.session.add(artist)
+            db.session.commit()
+            page_cache.invalidate("artists")
+            flash(f'Artist {request.form["name"]} was successfully listed!')
+        except ValueError as e:
+            print(e)
+            db.session.rollback()
+            flash("An error occurred. Venue " +
+                  request.form["name"] + " could not be listed.")
+        finally:
+            db.session.close()
+        return render_template("pages/home.html")
+    else:
+        flash_errors(form)
+        return render_template('forms/new_artist.html', form=form)
@@ -0,0 +1,71 @@
+""" ASGI entry point, the async serving mode:
+
+    pip install -r requirements-optional.txt
+    uvicorn asgi:application
+
+With ASYNC_VIEWS (the default), the read routes are served by the async
+views of async_views.py; without it, this serves the sync app unchanged,
+which is the baseline of benchmarks/async_views.py. Every request runs on
+one of ASGI_THREADS threads, and async views run on the server's event
+loop, which also owns the async connection pool (opened at lifespan
+startup). asgiref's WsgiToAsgi would run every request on one shared thread.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+from app import create_app
+from asyncdb import async_db
+from async_views import init_async_views
+
+
+class ThreadedWsgiToAsgi(WsgiToAsgi):
+    """ WsgiToAsgi running each request on a thread of `executor`."""
+
+    def __init__(self, wsgi_application, executor, startup=(), shutdown=()):
+        super().__init__(wsgi_application)
+        self.startup = startup
+        self.shutdown = shutdown
+        run_wsgi_app = sync_to_async(
+            WsgiToAsgiInstance.__dict__["run_wsgi_app"].func,
+            thread_sensitive=False,
+            executor=executor)
+
+        class Instance(WsgiToAsgiInstance):
+            async def run_wsgi_app(self, body):
+                return await run_wsgi_app(self, body)
+
+        self.instance_class = Instance
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        else:
+            await self.instance_class(self.wsgi_application)(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        """ Await the `startup` and `shutdown` hooks on the server's loop."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                for hook in self.startup:
+                    await hook()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for hook in self.shutdown:
+                    await hook()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+app = create_app()
+startup, shutdown = [], []
+if app.config["ASYNC_VIEWS"]:
+    init_async_views(app)
+    startup.append(async_db.start)
+    shutdown.append(async_db.stop)
+
+application = ThreadedWsgiToAsgi(
+    app, ThreadPoolExecutor(app.config["ASGI_THREADS"]),
+    startup=startup, shutdown=shutdown)
@@ -0,0 +1,258 @@
+""" Fingerprinted, minified and precompressed static assets.
+
+`flask assets build` copies every file under static/ to static/dist/ with
+a content hash in its name (css/main.css -> css/main.1a2b3c4d.css). CSS
+and JS are minified first, except `.min.` files, keeping /*! */ licence
+comments. The url() references in CSS and the sourceMappingURL comments in
+JS are rewritten to the hashed names. Text formats also get .gz and .br
+variants. static/dist/manifest.json maps each source name to its hashed
+name:
+
+    flask assets build
+
+`init_assets(app)` loads the manifest, so that
+`url_for("static", filename="css/main.css")` resolves to the hashed file.
+Hashed files are served with a year-long immutable Cache-Control, and with
+the precompressed variant the client accepts (br, then gzip). Without a
+manifest, e.g. in development, static files are served as before.
+"""
+import gzip
+import hashlib
+import importlib.util
+import itertools
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import time
+
+import click
+from flask import current_app, request, send_from_directory
+from flask.cli import AppGroup
+
+# Directory under static/ of the built files, and their manifest.
+DIST = "dist"
+MANIFEST = "manifest.json"
+# Precompressed variants by Content-Encoding, in order of preference.
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+# Formats worth compressing; images and woff fonts are compressed already.
+COMPRESSIBLE = frozenset([".css", ".js", ".map", ".svg", ".json", ".txt",
+                          ".ttf", ".otf", ".eot", ".html"])
+# A variant is kept only if at most this fraction of the original.
+MIN_RATIO = 0.9
+SKIPPED = frozenset([".gitkeep"])
+# Build dependencies of requirements.txt the build can do without, and what
+# is lost without them.
+DEGRADED_WITHOUT = {
+    "rjsmin": "JS files are only stripped of indentation and blank lines",
+    "brotli": "no .br variants are built",
+}
+
+CSS_TOKENS = re.compile(r"""
+    (?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')
+  | (?P<licence>/\*!.*?\*/)
+  | (?P<comment>/\*.*?\*/)
+  | (?P<space>\s+)
+""", re.S | re.X)
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+SOURCE_MAP = re.compile(r"(sourceMappingURL=)(\S+)")
+# Punctuation CSS allows whitespace around to be dropped.
+CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(text):
+    """ Drop comments and collapse whitespace, leaving strings and /*! */
+    licence comments untouched."""
+    # (text, kept verbatim), with whitespace runs as single spaces.
+    pieces = []
+    pos = 0
+    for match in CSS_TOKENS.finditer(text):
+        pieces.append((text[pos:match.start()], False))
+        if match.lastgroup in ("string", "licence"):
+            pieces.append((match.group(), True))
+        elif match.lastgroup == "space":
+            pieces.append((" ", False))
+        pos = match.end()
+    pieces.append((text[pos:], False))
+    out = []
+    for verbatim, group in itertools.groupby(pieces, key=lambda p: p[1]):
+        css = "".join(piece for piece, _ in group)
+        if not verbatim:
+            css = CSS_PUNCTUATION.sub(r"\1", re.sub(" {2,}", " ", css))
+            # Whitespace before a colon can be a descendant combinator.
+            css = css.replace(": ", ":").replace(";}", "}")
+        out.append(css)
+    return "".join(out).strip()
+
+
+def minify_js(text):
+    """ rjsmin of requirements.txt when installed; otherwise only leading
+    and trailing whitespace and blank lines are removed, which is always
+    safe outside template literals."""
+    try:
+        import rjsmin
+    except ImportError:
+        if "`" in text:
+            return text
+        return "\n".join(line.strip() for line in text.splitlines()
+                         if line.strip()) + "\n"
+    return rjsmin.jsmin(text, keep_bang_comments=True)
+
+
+def fingerprint(name, content):
+    root, ext = posixpath.splitext(name)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:8]}{ext}"
+
+
+def relative_target(name, reference, manifest):
+    """ The hashed counterpart of the relative `reference` made from the
+    file `name`, or None when it is not a built file."""
+    path, suffix = re.match(r"([^?#]*)(.*)", reference, re.S).groups()
+    if not path or re.match(r"[a-z][a-z0-9+.-]*:|/", path, re.I):
+        return None
+    target = posixpath.normpath(posixpath.join(posixpath.dirname(name), path))
+    if target not in manifest:
+        return None
+    hashed = posixpath.relpath(manifest[target], posixpath.dirname(name) or ".")
+    return hashed + suffix
+
+
+def rewrite_references(name, text, manifest):
+    """ Point the url() of CSS and the sourceMappingURL of JS at hashed names."""
+    def css_url(match):
+        target = relative_target(name, match.group(2), manifest)
+        return match.group(0) if target is None else f'url("{target}")'
+
+    def source_map(match):
+        target = relative_target(name, match.group(2), manifest)
+        return match.group(0) if target is None else match.group(1) + target
+
+    if name.endswith(".css"):
+        return CSS_URL.sub(css_url, text)
+    return SOURCE_MAP.sub(source_map, text)
+
+
+def compressed(content):
+    """ {suffix: bytes} of the precompressed variants worth keeping."""
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    try:
+        # In requirements.txt; build_command warns when it is missing.
+        import brotli
+    except ImportError:
+        pass
+    else:
+        variants[".br"] = brotli.compress(content, quality=11)
+    return {suffix: data for suffix, data in variants.items()
+            if len(data) <= len(content) * MIN_RATIO}
+
+
+def source_files(static_folder):
+    """ Names relative to `static_folder` of the files to build, with CSS and
+    JS last so the files they reference are hashed first."""
+    names = []
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = sorted(d for d in dirs if d != DIST)
+        for file in sorted(files):
+            if file not in SKIPPED:
+                path = os.path.join(root, file)
+                names.append(os.path.relpath(path, static_folder).replace(os.sep, "/"))
+    return sorted(names, key=lambda name: name.endswith((".css", ".js")))
+
+
+def build_assets(static_folder):
+    """ Build static/dist/ and its manifest. Yields (name, hashed name,
+    original size, built size, {suffix: compressed size})."""
+    dist = os.path.join(static_folder, DIST)
+    shutil.rmtree(dist, ignore_errors=True)
+    manifest = {}
+    for name in source_files(static_folder):
+        with open(os.path.join(static_folder, name), "rb") as f:
+            original = f.read()
+        content = original
+        if name.endswith((".css", ".js")):
+            text = rewrite_references(name, original.decode("utf-8"), manifest)
+            if ".min." not in name:
+                text = minify_css(text) if name.endswith(".css") else minify_js(text)
+            content = text.encode("utf-8")
+        hashed = fingerprint(name, content)
+        manifest[name] = hashed
+        variants = {}
+        if posixpath.splitext(name)[1] in COMPRESSIBLE:
+            variants = compressed(content)
+        path = os.path.join(dist, hashed)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for suffix, data in [("", content)] + list(variants.items()):
+            with open(path + suffix, "wb") as f:
+                f.write(data)
+        yield name, hashed, len(original), len(content), {
+            suffix: len(data) for suffix, data in variants.items()}
+    with open(os.path.join(dist, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def init_assets(app):
+    """ Serve the hashed static files of the manifest, when built."""
+    path = os.path.join(app.static_folder, DIST, MANIFEST)
+    if not app.config["STATIC_FINGERPRINTS"] or not os.path.exists(path):
+        return
+    with open(path) as f:
+        manifest = json.load(f)
+    max_age = app.config["STATIC_MAX_AGE"]
+
+    @app.url_defaults
+    def hashed_static(endpoint, values):
+        if endpoint == "static" and values.get("filename") in manifest:
+            values["filename"] = f"{DIST}/{manifest[values['filename']]}"
+
+    def static(filename):
+        if not filename.startswith(f"{DIST}/"):
+            return app.send_static_file(filename)
+        return send_built(app.static_folder, filename, max_age)
+
+    app.view_functions["static"] = static
+
+
+def send_built(static_folder, filename, max_age):
+    """ A hashed static file, precompressed when the client accepts it."""
+    path = os.path.join(static_folder, filename)
+    built = [encoding for encoding, suffix in ENCODINGS.items()
+             if os.path.exists(path + suffix)]
+    encoding = built and request.accept_encodings.best_match(built)
+    served = filename + ENCODINGS[encoding] if encoding else filename
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response = send_from_directory(static_folder, served, mimetype=mimetype,
+                                   max_age=max_age)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    # The name changes with the content, so the file never does.
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+assets_cli = AppGroup("assets", help="Build the static assets.")
+
+
+@assets_cli.command("build")
+def build_command():
+    """Fingerprint, minify and precompress static/ into static/dist/."""
+    for module, loss in DEGRADED_WITHOUT.items():
+        if importlib.util.find_spec(module) is None:
+            click.secho(f"Warning: {module} is not installed, {loss}. "
+                        f"Install requirements.txt.", fg="yellow", err=True)
+    start = time.perf_counter()
+    totals = [0, 0, 0]
+    for name, hashed, original, built, variants in build_assets(
+            current_app.static_folder):
+        best = min(variants.values(), default=built)
+        totals[0] += original
+        totals[1] += built
+        totals[2] += best
+        sizes = " ".join(f"{suffix[1:]} {size:>8}"
+                         for suffix, size in sorted(variants.items()))
+        click.echo(f"{hashed:<50} {original:>8} -> {built:>8}  {sizes}")
+    click.echo(f"{totals[0]} bytes -> {totals[1]} minified, {totals[2]} "
+               f"best encoding, in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,118 @@
+""" Async versions of the read routes, served by the ASGI mode (asgi.py).
+
+`init_async_views(app)` replaces the view functions of the listings, the
+search routes and the detail pages with the coroutines below. They query
+through `async_db` (asyncdb.py) and render with the same helpers as the
+sync views. A detail page runs its four independent queries (the entity,
+its upcoming and past shows and its show counts) concurrently on separate
+connections, after the version lookup of its conditional GET.
+
+Flask runs each async view to completion on the server's event loop, so a
+request still holds a server thread while it waits; the gain is the
+overlap of the queries within a request.
+"""
+from flask import abort, request
+
+from artists import render_artist, render_artists
+from asyncdb import async_db
+from cache import page_cache
+from conditional import conditional
+from dto import detail_row
+from models import Venue, Artist, Show
+from queries import (
+    artist_listing,
+    browse_args,
+    entity_version,
+    show_counts,
+    show_history,
+    show_listing,
+    venue_areas,
+)
+from search import search
+from shows import render_shows
+from venues import render_venue, render_venues
+from views import paginate, render_search
+
+
+def detail_calls(model, entity_id, fk, counterpart):
+    """ (fn, args, kwargs) of the independent queries of a detail page."""
+    history = dict(fk=fk, entity_id=entity_id, counterpart=counterpart)
+    return [
+        (detail_row, (model, entity_id), {}),
+        (paginate, (show_history, "upcoming_"), dict(history, upcoming=True)),
+        (paginate, (show_history, "past_"), dict(history, upcoming=False)),
+        (show_counts, (fk, entity_id), {}),
+    ]
+
+
+async def browse_version(listing):
+    return await async_db.run(paginate, listing, version=True,
+                              **browse_args(request.args))
+
+
+@conditional(lambda: browse_version(venue_areas))
+@page_cache.cached("venues")
+async def venues():
+    page = await async_db.run(paginate, venue_areas, **browse_args(request.args))
+    return render_venues(page)
+
+
+async def search_venues():
+    search_term = request.form.get("search_term", "")
+    rows = await async_db.run(search, Venue, search_term)
+    return render_search("pages/search_venues.html", search_term, rows)
+
+
+@conditional(lambda venue_id: async_db.run(entity_version, Venue, venue_id))
+@page_cache.cached("venue:{venue_id}")
+async def show_venue(venue_id):
+    venue, upcoming_page, past_page, counts = await async_db.gather(
+        *detail_calls(Venue, venue_id, Show.venue_id, Artist))
+    if venue is None:
+        abort(404)
+    return render_venue(venue, upcoming_page, past_page, counts)
+
+
+@conditional(lambda: browse_version(artist_listing))
+@page_cache.cached("artists")
+async def artists():
+    page = await async_db.run(paginate, artist_listing, **browse_args(request.args))
+    return render_artists(page)
+
+
+async def search_artists():
+    search_term = request.form.get("search_term", "")
+    rows = await async_db.run(search, Artist, search_term)
+    return render_search("pages/search_artists.html", search_term, rows)
+
+
+@conditional(lambda artist_id: async_db.run(entity_version, Artist, artist_id))
+@page_cache.cached("artist:{artist_id}")
+async def show_artist(artist_id):
+    artist, upcoming_page, past_page, counts = await async_db.gather(
+        *detail_calls(Artist, artist_id, Show.artist_id, Venue))
+    if artist is None:
+        abort(404)
+    return render_artist(artist, upcoming_page, past_page, counts)
+
+
+@conditional(lambda: async_db.run(paginate, show_listing, version=True))
+@page_cache.cached("shows")
+async def shows():
+    page = await async_db.run(paginate, show_listing)
+    return render_shows(page)
+
+
+READ_VIEWS = {
+    "venues": [venues, search_venues, show_venue],
+    "artists": [artists, search_artists, show_artist],
+    "shows": [shows],
+}
+
+
+def init_async_views(app):
+    """ Serve the read routes of `app` with the async views."""
+    async_db.init_app(app)
+    for blueprint, views in READ_VIEWS.items():
+        for view in views:
+            app.view_functions[f"{blueprint}.{view.__name__}"] = view
@@ -0,0 +1,81 @@
+""" Async database access for the async views, see async_views.py.
+
+The async engine connects with asyncpg to the same database as
+SQLALCHEMY_DATABASE_URI, with the same pool sizing. Query code stays
+synchronous: `async_db.run(fn, ...)` runs `fn` with a Session of its own
+on an async connection (AsyncSession.run_sync), so the functions of
+queries.py and search.py serve both modes, and `async_db.gather` runs
+independent queries concurrently, one connection each.
+
+Request transactions get the same statement timeouts as db.session, and
+the queries are counted by the instrumentation when it is enabled.
+"""
+import asyncio
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from instrumentation import instrumentation
+from pool import init_statement_timeouts
+
+
+class RequestSession(Session):
+    """ Sync session class of the async sessions."""
+
+
+class AsyncDatabase:
+    def __init__(self, app=None):
+        self.url = None
+        self.options = {}
+        self.engine = None
+        self.sessionmaker = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Optional dependencies, only needed for the async views.
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        self.url = make_url(app.config["SQLALCHEMY_DATABASE_URI"]).set(
+            drivername="postgresql+asyncpg")
+        self.options = {name: value for name, value
+                        in app.config["SQLALCHEMY_ENGINE_OPTIONS"].items()
+                        if name != "poolclass"}
+        # asyncpg connections belong to the event loop that opened them.
+        # Outside an ASGI server, Flask runs every async view on a new loop,
+        # so connections are opened per query until start() is awaited.
+        self.engine = self.create_engine(poolclass=NullPool)
+        self.sessionmaker = async_sessionmaker(
+            sync_session_class=RequestSession, expire_on_commit=False)
+        init_statement_timeouts(app, RequestSession)
+
+    def create_engine(self, **options):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        engine = create_async_engine(self.url, **options)
+        if instrumentation.enabled:
+            instrumentation.watch(engine.sync_engine)
+        return engine
+
+    async def start(self):
+        """ Pool connections on the running loop, the server's."""
+        self.engine = self.create_engine(**self.options)
+
+    async def stop(self):
+        await self.engine.dispose()
+
+    async def run(self, fn, *args, **kwargs):
+        """ Await fn(*args, session=<session>, **kwargs) on a connection of
+        its own. Loaded objects stay usable after the session closes."""
+        async with self.sessionmaker(bind=self.engine) as session:
+            return await session.run_sync(
+                lambda sync_session: fn(*args, session=sync_session, **kwargs))
+
+    async def gather(self, *calls):
+        """ Run (fn, args, kwargs) calls concurrently, see run()."""
+        return await asyncio.gather(
+            *(self.run(fn, *args, **kwargs) for fn, args, kwargs in calls))
+
+
+async_db = AsyncDatabase()
@@ -0,0 +1,77 @@
+""" Show booking availability.
+
+A show occupies its venue and artist for SHOW_DURATION minutes from its
+start time, so two shows conflict when they share the venue or the artist
+and start less than SHOW_DURATION apart. Both checks are range scans on
+the (venue_id, start_time) and (artist_id, start_time) indexes of Show.
+"""
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import or_
+
+from models import db, Venue, Artist, Show
+
+
+def show_duration():
+    return timedelta(minutes=current_app.config["SHOW_DURATION"])
+
+
+def conflicts(venue_id, artist_id, start_time, duration=None):
+    """ Shows booking the venue or the artist within `duration` of
+    `start_time`, in one query."""
+    duration = duration or show_duration()
+    return db.session.query(
+        Show.id, Show.venue_id, Show.artist_id, Show.start_time
+    ).filter(
+        or_(Show.venue_id == venue_id, Show.artist_id == artist_id),
+        Show.start_time > start_time - duration,
+        Show.start_time < start_time + duration,
+    ).order_by(Show.start_time).all()
+
+
+def check_booking(venue_id, artist_id, start_time):
+    """ Reasons a show cannot be booked, empty if it can. Locks the venue and
+    artist rows until the caller's transaction ends, so concurrent bookings
+    of either are checked one after the other."""
+    errors = []
+    venue = db.session.query(Venue.id).filter(
+        Venue.id == venue_id).with_for_update().scalar()
+    artist = db.session.query(Artist.id).filter(
+        Artist.id == artist_id).with_for_update().scalar()
+    if venue is None:
+        errors.append(f"Venue {venue_id} does not exist.")
+    if artist is None:
+        errors.append(f"Artist {artist_id} does not exist.")
+    if errors:
+        return errors
+    for show in conflicts(venue_id, artist_id, start_time):
+        booked = "Venue" if show.venue_id == venue_id else "Artist"
+        errors.append(f"{booked} is already booked for a show at "
+                      f"{show.start_time:%Y-%m-%d %H:%M}.")
+    return errors
+
+
+def free_slots(venue_id, start, end, artist_id=None, duration=None):
+    """ Free periods of the venue (and of the artist, if given) between
+    `start` and `end`, each long enough for a show: [(from, to), ...].
+    A show fits when it starts between `from` and `to - duration`."""
+    duration = duration or show_duration()
+    booked = Show.venue_id == venue_id
+    if artist_id is not None:
+        booked = or_(booked, Show.artist_id == artist_id)
+    starts = db.session.query(Show.start_time).filter(
+        booked,
+        Show.start_time > start - duration,
+        Show.start_time < end,
+    ).order_by(Show.start_time)
+
+    free = []
+    cursor = start
+    for show_start, in starts:
+        if show_start - cursor >= duration:
+            free.append((cursor, show_start))
+        cursor = max(cursor, show_start + duration)
+    if end - cursor >= duration:
+        free.append((cursor, end))
+    return free
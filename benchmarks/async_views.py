@@ -0,0 +1,110 @@
+""" Compare the sync and async serving modes on the read routes.
+
+Serves asgi.py with uvicorn twice, with ASYNC_VIEWS=False (the sync views)
+and ASYNC_VIEWS=True, and drives both with the same requests at the same
+concurrency. The page cache is disabled so every request renders:
+
+    pip install -r requirements-optional.txt
+    BENCHMARK_DATABASE_URI=postgresql://localhost/fyyur_bench \
+        python -m benchmarks.async_views --concurrency 16
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ["BENCHMARK_DATABASE_URI"]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.routes import http_request, measure, sample_ids  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = [("sync", "False"), ("async", "True")]
+
+
+def read_routes(ids):
+    (busy_venue, venue), (busy_artist, artist) = ids["venue"], ids["artist"]
+    return [
+        ("venues", "GET", "/venues", None),
+        ("search_venues", "POST", "/venues/search", {"search_term": "Venue 1"}),
+        ("show_venue_busiest", "GET", f"/venues/{busy_venue}", None),
+        ("show_venue", "GET", f"/venues/{venue}", None),
+        ("artists", "GET", "/artists", None),
+        ("search_artists", "POST", "/artists/search", {"search_term": "Artist 2"}),
+        ("show_artist_busiest", "GET", f"/artists/{busy_artist}", None),
+        ("show_artist", "GET", f"/artists/{artist}", None),
+        ("shows", "GET", "/shows", None),
+    ]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(async_views, port):
+    env = dict(os.environ, ASYNC_VIEWS=async_views, CACHE_TYPE="null",
+               INSTRUMENTATION="False", SECRET_KEY="benchmark")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "asgi:application",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/")
+            return server
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Requests per route.")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Client threads, the same for both modes.")
+    args = parser.parse_args()
+
+    from app import create_app
+    from models import db
+    app = create_app()
+    with app.app_context():
+        ids = sample_ids(db)
+
+    results = {}
+    for mode, async_views in MODES:
+        port = free_port()
+        server = serve(async_views, port)
+        send = http_request(f"http://127.0.0.1:{port}")
+        try:
+            results[mode] = {
+                name: measure(send, method, path, data, args.requests,
+                              args.concurrency)
+                for name, method, path, data in read_routes(ids)}
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"concurrency {args.concurrency}, {args.requests} requests per route")
+    print(f"{'route':<22} {'sync req/s':>11} {'async req/s':>12} "
+          f"{'sync p95 ms':>12} {'async p95 ms':>13}")
+    errors = 0
+    for name in results["sync"]:
+        sync, async_ = results["sync"][name], results["async"][name]
+        errors += sync["errors"] + async_["errors"]
+        print(f"{name:<22} {sync['rps']:>11.1f} {async_['rps']:>12.1f} "
+              f"{sync['p95_ms']:>12.2f} {async_['p95_ms']:>13.2f}")
+    if errors:
+        print(f"{errors} requests failed", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+""" Benchmark booking conflict checks and free-slot lookups.
+
+Run against a database seeded by benchmarks.seed, ideally with millions
+of shows:
+
+    BENCHMARK_DATABASE_URI=postgresql://localhost/fyyur_bench \
+        python -m benchmarks.availability
+
+Reports the round trip of availability.conflicts() and free_slots() as
+seen by the app, and the server-side execution time, from EXPLAIN ANALYZE,
+of the statement conflicts() sends.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ["BENCHMARK_DATABASE_URI"]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+from availability import conflicts, free_slots  # noqa: E402
+from models import Venue, Artist, Show  # noqa: E402
+from plans import captured_statements  # noqa: E402
+
+app = create_app()
+
+CHECKS = 2000
+EXPLAINED = 100
+
+
+def summary(timings):
+    timings = sorted(timings)
+    return (f"median {statistics.median(timings) * 1e6:7.0f}us  "
+            f"p99 {timings[int(len(timings) * 0.99)] * 1e6:7.0f}us")
+
+
+def main():
+    random.seed(42)
+    with app.app_context():
+        shows = db.session.query(func.count(Show.id)).scalar()
+        venues = db.session.query(func.max(Venue.id)).scalar()
+        artists = db.session.query(func.max(Artist.id)).scalar()
+        now = datetime.now()
+        cases = [(random.randint(1, venues), random.randint(1, artists),
+                  now + timedelta(days=random.uniform(-240, 120)))
+                 for _ in range(CHECKS)]
+        print(f"shows={shows} venues={venues} artists={artists}")
+
+        timings = []
+        for venue_id, artist_id, start_time in cases:
+            start = time.perf_counter()
+            conflicts(venue_id, artist_id, start_time)
+            timings.append(time.perf_counter() - start)
+        print(f"conflicts()        round trip  {summary(timings)}")
+
+        connection = db.session.connection()
+        executions = []
+        for venue_id, artist_id, start_time in cases[:EXPLAINED]:
+            with captured_statements(connection) as statements:
+                conflicts(venue_id, artist_id, start_time)
+            (statement, parameters), = statements
+            plan = connection.exec_driver_sql(
+                "EXPLAIN (ANALYZE, FORMAT JSON) " + statement,
+                parameters).scalar()
+            executions.append(plan[0]["Execution Time"] / 1000)
+        print(f"conflict query     server      {summary(executions)}")
+
+        timings = []
+        for venue_id, artist_id, start_time in cases[:500]:
+            start = time.perf_counter()
+            free_slots(venue_id, start_time, start_time + timedelta(days=7),
+                       artist_id=artist_id)
+            timings.append(time.perf_counter() - start)
+        print(f"free_slots() week  round trip  {summary(timings)}")
+
+
+if __name__ == "__main__":
+    main()
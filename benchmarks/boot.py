@@ -0,0 +1,89 @@
+""" Measure worker boot time: importing the app module and create_app().
+
+Each run is a fresh Python process, like a new worker:
+
+    BENCHMARK_DATABASE_URI=postgresql://localhost/fyyur_bench \
+        python -m benchmarks.boot --runs 10 --top 15
+
+Also lists the optional heavy dependencies a booted worker has imported
+(they should be imported only by the CLI or on first use) and, with
+--top, the slowest imports of app.py as reported by `python -X importtime`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ["BENCHMARK_DATABASE_URI"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Imported lazily: by the CLI, the form pages or the first formatted date.
+LAZY = ["alembic", "flask_migrate", "babel", "dateutil", "wtforms",
+        "flask_wtf", "flask_moment", "importer", "plans"]
+
+# Runs in the fresh process: prints {"import": ms, "factory": ms, ...}.
+WORKER = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+booted = time.perf_counter()
+print(json.dumps({
+    "import": (imported - start) * 1000,
+    "factory": (booted - imported) * 1000,
+    "modules": len(sys.modules),
+    "lazy": [name for name in sys.argv[1:] if name in sys.modules],
+}))
+"""
+
+
+def worker(env, *options):
+    out = subprocess.run(
+        [sys.executable, *options, "-c", WORKER, *LAZY], cwd=ROOT, env=env,
+        check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.splitlines()[-1]), out.stderr
+
+
+def slowest_imports(stderr, top):
+    """ (cumulative ms, module) of the slowest imports of the app module."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # importtime indents each level by two; "app" is at the first.
+        if name.startswith("   ") and not name.startswith("    "):
+            imports.append((int(cumulative) / 1000, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10,
+                        help="Fresh processes to take the median of.")
+    parser.add_argument("--top", type=int, default=0,
+                        help="Also list the N slowest top-level imports.")
+    args = parser.parse_args()
+
+    env = dict(os.environ, SECRET_KEY="benchmark")
+    # The first run fills the bytecode caches of Python and Jinja.
+    worker(env)
+    runs = [worker(env)[0] for _ in range(args.runs)]
+    imports = statistics.median(run["import"] for run in runs)
+    factory = statistics.median(run["factory"] for run in runs)
+    print(f"import app    {imports:7.1f}ms")
+    print(f"create_app()  {factory:7.1f}ms")
+    print(f"boot          {imports + factory:7.1f}ms  "
+          f"({runs[0]['modules']} modules)")
+    print(f"lazy imports loaded at boot: {', '.join(runs[0]['lazy']) or 'none'}")
+    if args.top:
+        _, stderr = worker(env, "-X", "importtime")
+        for ms, name in slowest_imports(stderr, args.top):
+            print(f"  {ms:7.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
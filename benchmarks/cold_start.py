@@ -0,0 +1,85 @@
+""" Measure the startup and first-request latency of a fresh worker.
+
+Starts a new Python process per run, which imports the app (timed) and
+then requests each page once through the Flask test client (timed), under
+each template setup: no bytecode cache and no warm-up (templates compile on
+their first request), warm-up with no cache (they compile at startup), and
+warm-up from a filesystem cache filled by an earlier worker:
+
+    BENCHMARK_DATABASE_URI=postgresql://localhost/fyyur_bench \
+        python -m benchmarks.cold_start
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ["BENCHMARK_DATABASE_URI"]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETUPS = [
+    ("lazy", dict(TEMPLATE_CACHE_TYPE="null", TEMPLATE_WARMUP="False")),
+    ("warmup", dict(TEMPLATE_CACHE_TYPE="null", TEMPLATE_WARMUP="True")),
+    ("warmup+fs_cache", dict(TEMPLATE_CACHE_TYPE="filesystem",
+                             TEMPLATE_WARMUP="True")),
+]
+
+# Runs in the fresh process: prints {"startup": ms, "<path>": ms, ...}.
+WORKER = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app()
+timings = {"startup": (time.perf_counter() - start) * 1000}
+client = app.test_client()
+for path in sys.argv[1:]:
+    start = time.perf_counter()
+    assert client.get(path).status_code == 200, path
+    timings[path] = (time.perf_counter() - start) * 1000
+print(json.dumps(timings))
+"""
+
+
+def worker(env, paths):
+    out = subprocess.run(
+        [sys.executable, "-c", WORKER, *paths], cwd=ROOT, env=env,
+        check=True, capture_output=True, text=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Fresh processes per setup.")
+    args = parser.parse_args()
+
+    from app import create_app
+    from models import db
+    app = create_app()
+    from benchmarks.routes import sample_ids
+    with app.app_context():
+        ids = sample_ids(db)
+    paths = [f"/venues/{ids['venue'][1]}", "/shows", "/venues/create",
+             "/artists/create", "/shows/create"]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, CACHE_TYPE="null", INSTRUMENTATION="False",
+                   SECRET_KEY="benchmark", TEMPLATE_CACHE_DIR=cache_dir)
+        print(f"{'setup':<16} {'startup':>9} " +
+              " ".join(f"{path:>15}" for path in paths))
+        for name, setup in SETUPS:
+            # Fills the filesystem cache, as the first worker on a host would.
+            worker(dict(env, **setup), paths)
+            runs = [worker(dict(env, **setup), paths) for _ in range(args.runs)]
+            medians = {key: statistics.median(run[key] for run in runs)
+                       for key in runs[0]}
+            print(f"{name:<16} {medians['startup']:7.1f}ms " +
+                  " ".join(f"{medians[path]:13.1f}ms" for path in paths))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+""" Micro-benchmark of the `datetime` Jinja filter.
+
+Compares the old path (strftime in the route, dateutil parse and babel
+format in the filter) with formatting.format_datetime on native datetimes:
+
+    python -m benchmarks.datetime_filter
+"""
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import babel.dates  # noqa: E402
+import dateutil.parser  # noqa: E402
+
+from formatting import FORMATS, format_datetime  # noqa: E402
+
+SHOWS = 1000
+RUNS = 20
+
+
+def legacy_format_datetime(value, format="medium"):
+    date = dateutil.parser.parse(value)
+    return babel.dates.format_datetime(date, FORMATS[format], locale="en")
+
+
+def main():
+    start = datetime(2026, 1, 1, 20, 0)
+    values = [start + timedelta(hours=7 * i) for i in range(SHOWS)]
+    strings = [v.strftime("%m/%d/%Y, %H:%M") for v in values]
+
+    cases = {
+        "legacy (strftime + parse)": lambda: [
+            legacy_format_datetime(s, "full") for s in strings],
+        "format_datetime": lambda: [format_datetime(v, "full") for v in values],
+    }
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=RUNS))
+        print(f"{name:28} {best * 1000:7.2f}ms per {SHOWS} shows "
+              f"{best / SHOWS * 1e6:6.2f}us per call")
+
+
+if __name__ == "__main__":
+    main()
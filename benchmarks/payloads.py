@@ -0,0 +1,79 @@
+""" Measure memory and payload-building time of the largest detail pages.
+
+Requests the busiest venue's and artist's pages with the largest page of
+shows through the Flask test client:
+
+    BENCHMARK_DATABASE_URI=postgresql://localhost/fyyur_bench \
+        python -m benchmarks.payloads
+
+Memory is the tracemalloc peak of a request. View time is what the
+Server-Timing header leaves once database and template time are taken
+out: loading rows into objects and building the template payload.
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ["BENCHMARK_DATABASE_URI"]
+os.environ["INSTRUMENTATION"] = "True"
+os.environ["CACHE_TYPE"] = "null"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+from benchmarks.routes import sample_ids  # noqa: E402
+
+app = create_app()
+
+TIMING = re.compile(r"(\w+);dur=([\d.]+)")
+
+
+def measure(client, path, requests):
+    peaks, view_times, totals = [], [], []
+    tracemalloc.start()
+    for _ in range(requests):
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        assert client.get(path).status_code == 200
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - start)
+    tracemalloc.stop()
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(path)
+        totals.append(time.perf_counter() - start)
+        timings = {name: float(value) for name, value
+                   in TIMING.findall(response.headers["Server-Timing"])}
+        view_times.append(timings["total"] - timings["db"] - timings["tpl"])
+    return {
+        "peak_kib": statistics.median(peaks) / 1024,
+        "view_ms": statistics.median(view_times),
+        "total_ms": statistics.median(totals) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+
+    with app.app_context():
+        ids = sample_ids(db)
+    per_page = app.config["MAX_PAGE_SIZE"]
+    client = app.test_client()
+    for name, path in (("show_venue_busiest", f"/venues/{ids['venue'][0]}"),
+                       ("show_artist_busiest", f"/artists/{ids['artist'][0]}")):
+        path += f"?per_page={per_page}"
+        client.get(path)
+        r = measure(client, path, args.requests)
+        print(f"{name:<22} peak {r['peak_kib']:8.1f} KiB  view {r['view_ms']:6.2f}ms  "
+              f"total {r['total_ms']:6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+""" Benchmark every route of app.py and record a JSON baseline.
+
+Seed a scratch database with benchmarks.seed first, then:
+
+    BENCHMARK_DATABASE_URI=postgresql://localhost/fyyur_bench \
+        python -m benchmarks.routes --output baseline.json
+    BENCHMARK_DATABASE_URI=... python -m benchmarks.routes --mode http \
+        --concurrency 8 --compare baseline.json
+
+`client` mode sends sequential requests through the Flask test client.
+`http` mode serves the app on a local port and drives it with
+`--concurrency` threads. Each route records its throughput, p50/p95/p99
+latency and query count; query counts come from the Server-Timing header.
+
+The page cache is disabled unless --cache is given, so every request
+renders. Write routes (create and edit) run only with --writes; edits
+resubmit the current values. Deletes are never benchmarked.
+
+`--compare OLD [NEW]` prints the change from a saved baseline to this run,
+or to another saved file. Exits non-zero if any route answered with an
+error status.
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pool import percentile  # noqa: E402
+
+QUERIES = re.compile(r'desc="(\d+) queries')
+# Latency or throughput changes beyond this fraction are flagged by --compare.
+TOLERANCE = 0.10
+
+
+def sample_ids(db):
+    """ The busiest and a typical venue and artist, by show count."""
+    from sqlalchemy import text
+    ids = {}
+    for table in ("Venue", "Artist"):
+        busiest, typical = db.session.execute(text(f"""
+            SELECT (SELECT id FROM "{table}"
+                    ORDER BY upcoming_shows_count + past_shows_count DESC, id
+                    LIMIT 1),
+                   (SELECT id FROM "{table}" ORDER BY id
+                    OFFSET (SELECT count(*) / 2 FROM "{table}") LIMIT 1)
+        """)).one()
+        ids[table.lower()] = (busiest, typical)
+    return ids
+
+
+def edit_form(model, entity_id):
+    """ The form data of an unchanged edit, at the entity's current version."""
+    from edits import edit_row
+    row = edit_row(model, entity_id)._asdict()
+    for field, value in list(row.items()):
+        if value is None or value is False:
+            del row[field]
+        elif value is True:
+            row[field] = "y"
+    return row
+
+
+def routes(ids, writes, edits=None, next_slot=None):
+    """ (name, method, path, form data) for every benchmarked route.
+    `edits` holds the venue and artist edit form data; `next_slot()`
+    returns a free start time for every show booked. Form data may be a callable, called
+    once per request."""
+    (busy_venue, venue), (busy_artist, artist) = ids["venue"], ids["artist"]
+    reads = [
+        ("index", "GET", "/", None),
+        ("venues", "GET", "/venues", None),
+        ("venues_max_page", "GET", "/venues?per_page=200", None),
+        ("search_venues", "POST", "/venues/search", {"search_term": "Venue 1"}),
+        ("show_venue_busiest", "GET", f"/venues/{busy_venue}", None),
+        ("show_venue", "GET", f"/venues/{venue}", None),
+        ("create_venue_form", "GET", "/venues/create", None),
+        ("edit_venue", "GET", f"/venues/{venue}/edit", None),
+        ("artists", "GET", "/artists", None),
+        ("search_artists", "POST", "/artists/search", {"search_term": "Artist 2"}),
+        ("show_artist_busiest", "GET", f"/artists/{busy_artist}", None),
+        ("show_artist", "GET", f"/artists/{artist}", None),
+        ("create_artist_form", "GET", "/artists/create", None),
+        ("edit_artist", "GET", f"/artists/{artist}/edit", None),
+        ("shows", "GET", "/shows", None),
+        ("create_show_form", "GET", "/shows/create", None),
+        ("api_venues", "GET", "/api/v1/venues", None),
+        ("api_shows", "GET", f"/api/v1/shows?venue_id={busy_venue}", None),
+        ("cache_stats", "GET", "/cache/stats", None),
+        ("pool_status", "GET", "/pool/status", None),
+    ]
+    if not writes:
+        return reads
+    entity = {
+        "name": "Benchmark", "city": "Benchmark City", "state": "CA",
+        "phone": "123-456-7890", "genres": "Jazz",
+        "facebook_link": "https://www.facebook.com/benchmark",
+    }
+
+    def show():
+        # A new start time each time, or every request after the first would
+        # measure the rejected double booking.
+        return {"venue_id": venue, "artist_id": artist,
+                "start_time": next_slot().strftime("%Y-%m-%d %H:%M:%S")}
+
+    return reads + [
+        ("create_venue", "POST", "/venues/create", dict(entity, address="1 Main St")),
+        ("edit_venue_submission", "POST", f"/venues/{venue}/edit", edits["venue"]),
+        ("create_artist", "POST", "/artists/create", entity),
+        ("edit_artist_submission", "POST", f"/artists/{artist}/edit", edits["artist"]),
+        ("create_show", "POST", "/shows/create", show),
+    ]
+
+
+def client_request(client):
+    def send(method, path, data):
+        response = client.open(path, method=method, data=data)
+        return response.status_code, response.headers.get("Server-Timing", "")
+    return send
+
+
+def http_request(base_url):
+    def send(method, path, data):
+        body = urllib.parse.urlencode(data, doseq=True).encode() if data else None
+        request = urllib.request.Request(base_url + path, data=body, method=method)
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status, response.headers.get("Server-Timing", "")
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get("Server-Timing", "")
+    return send
+
+
+def measure(send, method, path, data, requests, concurrency, warmup=2):
+    form = data if callable(data) else lambda: data
+    for _ in range(warmup):
+        send(method, path, form())
+
+    def timed(_):
+        body = form()
+        start = time.perf_counter()
+        status, timing = send(method, path, body)
+        match = QUERIES.search(timing)
+        return (time.perf_counter() - start, status,
+                int(match.group(1)) if match else None)
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(timed, range(requests)))
+    else:
+        results = [timed(i) for i in range(requests)]
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _, _ in results]
+    queries = [count for _, _, count in results if count is not None]
+    return {
+        "method": method,
+        "path": path,
+        "requests": requests,
+        "errors": sum(status >= 400 for _, status, _ in results),
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "queries": statistics.median(queries) if queries else None,
+    }
+
+
+def run(args):
+    os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ["BENCHMARK_DATABASE_URI"]
+    os.environ["INSTRUMENTATION"] = "True"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    if not args.cache:
+        os.environ["CACHE_TYPE"] = "null"
+
+    from sqlalchemy import text
+    from app import create_app
+    from models import db
+    app = create_app()
+    from models import Venue, Artist, Show
+
+    with app.app_context():
+        ids = sample_ids(db)
+        # Edits resubmit the current values, so the version stays valid.
+        edits = {"venue": edit_form(Venue, ids["venue"][1]),
+                 "artist": edit_form(Artist, ids["artist"][1])}
+        # Book shows after the latest one of the venue or the artist, a
+        # show's length plus an hour apart, so that none of them conflict.
+        latest = db.session.query(db.func.max(Show.start_time)).filter(
+            (Show.venue_id == ids["venue"][1])
+            | (Show.artist_id == ids["artist"][1])).scalar()
+        gap = timedelta(minutes=app.config["SHOW_DURATION"] + 60)
+        first = max(latest + gap if latest else datetime.min,
+                    datetime.now() + timedelta(days=30))
+        # next() on a count is atomic, so concurrent threads each get
+        # their own slot.
+        counter = itertools.count()
+
+        def next_slot():
+            return first + next(counter) * gap
+        volumes = {table: db.session.execute(
+            text(f'SELECT count(*) FROM "{table}"')).scalar()
+            for table in ("Venue", "Artist", "Show")}
+
+    server = None
+    if args.mode == "http":
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        server = make_server("127.0.0.1", 0, app, threaded=True,
+                             request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        send = http_request(f"http://127.0.0.1:{server.server_port}")
+        concurrency = args.concurrency
+    else:
+        send = client_request(app.test_client())
+        concurrency = 1
+
+    results = {}
+    try:
+        for name, method, path, data in routes(ids, args.writes, edits, next_slot):
+            results[name] = measure(send, method, path, data,
+                                    args.requests, concurrency)
+            r = results[name]
+            print(f"{name:<24} {r['rps']:>8.1f} req/s  p50 {r['p50_ms']:>8.2f}ms  "
+                  f"p95 {r['p95_ms']:>8.2f}ms  p99 {r['p99_ms']:>8.2f}ms  "
+                  f"queries {r['queries']}  errors {r['errors']}")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                            capture_output=True, text=True).stdout.strip()
+    return {
+        "commit": commit or None,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "mode": args.mode,
+        "concurrency": concurrency,
+        "cache": args.cache,
+        "volumes": volumes,
+        "routes": results,
+    }
+
+
+def compare(old, new):
+    """ Print the per-route change from `old` to `new`; slower p95 or lower
+    throughput beyond TOLERANCE is flagged."""
+    for setting in ("mode", "concurrency", "cache", "volumes"):
+        if old.get(setting) != new.get(setting):
+            print(f"warning: {setting} differs: {old.get(setting)} vs {new.get(setting)}")
+    print(f"{'route':<24} {'p95 ms':>21} {'req/s':>21} {'queries':>9}")
+    for name, after in new["routes"].items():
+        before = old["routes"].get(name)
+        if before is None:
+            print(f"{name:<24} (new)")
+            continue
+        flag = ""
+        if (after["p95_ms"] > before["p95_ms"] * (1 + TOLERANCE)
+                or after["rps"] < before["rps"] * (1 - TOLERANCE)):
+            flag = "  REGRESSION"
+        queries = ("" if before["queries"] == after["queries"]
+                   else f"{before['queries']}->{after['queries']}")
+        print(f"{name:<24} {before['p95_ms']:>9.2f} -> {after['p95_ms']:>8.2f} "
+              f"{before['rps']:>9.1f} -> {after['rps']:>8.1f} {queries:>9}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["client", "http"], default="client")
+    parser.add_argument("--requests", type=int, default=50,
+                        help="Requests per route.")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Client threads in http mode.")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep the page cache enabled.")
+    parser.add_argument("--writes", action="store_true",
+                        help="Also benchmark the create and edit routes.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", nargs="+", metavar="BASELINE",
+                        help="Compare this run (or a second file) to a baseline.")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline and optionally a second file")
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0]) as old, open(args.compare[1]) as new:
+            compare(json.load(old), json.load(new))
+        return
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare[0]) as old:
+            compare(json.load(old), results)
+    if any(r["errors"] for r in results["routes"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+""" Seed a scratch database with synthetic Venues, Artists and Shows.
+
+Volumes are configurable and the data is skewed the way real listings are:
+a few genres, states and cities hold most entities, a few venues and
+artists hold most shows, and show dates are spread over the past year and
+the coming months. A fixed seed makes runs
+reproducible. Every table is truncated first:
+
+    BENCHMARK_DATABASE_URI=postgresql://localhost/fyyur_bench \
+        python -m benchmarks.seed --venues 10000 --artists 5000 --shows 200000
+"""
+import argparse
+import os
+import sys
+
+os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ["BENCHMARK_DATABASE_URI"]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+from enums import Genre, State  # noqa: E402
+from stats import COUNTED  # noqa: E402
+
+app = create_app()
+
+# random() ** SKEW picks low indexes far more often than high ones.
+SKEW = 2
+
+ENTITY = """
+    INSERT INTO "{table}" (name, city, state, phone, genres, facebook_link,
+                           {seeking}, image_link)
+    SELECT '{table} ' || g,
+           'City ' || floor(:cities * random() ^ {skew})::int,
+           (:states)[1 + floor(cardinality(:states) * random() ^ {skew})::int],
+           '123-456-' || lpad((g % 10000)::text, 4, '0'),
+           ARRAY(SELECT DISTINCT (:genres)[1 + floor(
+                     cardinality(:genres) * random() ^ {skew})::int]
+                 FROM generate_series(0, g % 3)),
+           'https://www.facebook.com/{table}' || g,
+           random() < 0.3,
+           'https://picsum.photos/seed/{table}' || g || '/300'
+    FROM generate_series(1, :count) AS g
+"""
+
+COUNTERS = """
+    UPDATE "{table}" t
+    SET upcoming_shows_count = s.upcoming,
+        past_shows_count = s.past,
+        next_show_time = s.next_show_time
+    FROM (SELECT {fk} AS id,
+                 count(*) FILTER (WHERE start_time > localtimestamp) AS upcoming,
+                 count(*) FILTER (WHERE start_time <= localtimestamp) AS past,
+                 min(start_time) FILTER (WHERE start_time > localtimestamp)
+                     AS next_show_time
+          FROM "Show" GROUP BY {fk}) AS s
+    WHERE t.id = s.id
+"""
+
+
+def seed(venues, artists, shows, cities=None, seed=0.42):
+    """ Replace every Venue, Artist and Show with generated rows."""
+    params = {
+        "cities": cities or max(venues // 20, 1),
+        "states": [state.name for state in State],
+        "genres": [genre.name for genre in Genre],
+    }
+    db.session.execute(text(
+        'TRUNCATE "Show", "Venue", "Artist" RESTART IDENTITY CASCADE'))
+    db.session.execute(text("SELECT setseed(:seed)"), {"seed": seed})
+    db.session.execute(
+        text(ENTITY.format(table="Venue", seeking="seeking_talent", skew=SKEW)),
+        dict(params, count=venues))
+    db.session.execute(text("""UPDATE "Venue" SET address = id || ' Main St'"""))
+    db.session.execute(
+        text(ENTITY.format(table="Artist", seeking="seeking_venue", skew=SKEW)),
+        dict(params, count=artists))
+    # Evening shows, two thirds of them in the past year and the rest in the
+    # coming four months.
+    db.session.execute(text(f"""
+        INSERT INTO "Show" (start_time, venue_id, artist_id)
+        SELECT date_trunc('day', localtimestamp)
+                   + (floor(random() * 365) - 243) * interval '1 day'
+                   + (18 + floor(random() * 5)) * interval '1 hour',
+               1 + floor(:venues * random() ^ {SKEW})::int,
+               1 + floor(:artists * random() ^ {SKEW})::int
+        FROM generate_series(1, :shows)
+    """), {"venues": venues, "artists": artists, "shows": shows})
+    # New rows start with zero counters, so one grouped pass over Show fills
+    # them; stats.refresh() would run a correlated count per row.
+    for model, fk in COUNTED:
+        db.session.execute(text(COUNTERS.format(
+            table=model.__tablename__, fk=fk.key)))
+    db.session.commit()
+    db.session.execute(text('ANALYZE "Venue", "Artist", "Show"'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--venues", type=int, default=10000)
+    parser.add_argument("--artists", type=int, default=5000)
+    parser.add_argument("--shows", type=int, default=200000)
+    parser.add_argument("--cities", type=int)
+    parser.add_argument("--seed", type=float, default=0.42)
+    args = parser.parse_args()
+    with app.app_context():
+        db.create_all()
+        seed(args.venues, args.artists, args.shows, args.cities, args.seed)
+    print(f"Seeded {args.venues} venues, {args.artists} artists, "
+          f"{args.shows} shows.")
+
+
+if __name__ == "__main__":
+    main()
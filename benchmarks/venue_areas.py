@@ -0,0 +1,42 @@
+""" Benchmark the /venues area aggregation against growing data volumes.
+
+Run against a scratch database, every table is truncated between scales:
+
+    BENCHMARK_DATABASE_URI=postgresql://localhost/fyyur_bench \
+        python -m benchmarks.venue_areas
+"""
+import os
+import statistics
+import sys
+import time
+
+os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ["BENCHMARK_DATABASE_URI"]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db  # noqa: E402
+from benchmarks.seed import app, seed  # noqa: E402
+from queries import venue_areas  # noqa: E402
+
+# (venues, shows)
+SCALES = [(1000, 10000), (10000, 100000), (100000, 1000000)]
+RUNS = 5
+
+
+def main():
+    with app.app_context():
+        db.create_all()
+        for venues, shows in SCALES:
+            seed(venues, max(venues // 10, 1), shows)
+            timings = []
+            for _ in range(RUNS):
+                start = time.perf_counter()
+                venue_areas()
+                timings.append(time.perf_counter() - start)
+            median = statistics.median(timings)
+            print(f"venues={venues:>7} shows={shows:>8} "
+                  f"median={median * 1000:8.1f}ms "
+                  f"per_venue={median / venues * 1e6:6.2f}us")
+
+
+if __name__ == "__main__":
+    main()
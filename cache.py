@@ -0,0 +1,208 @@
+""" Rendered-page cache.
+
+Read routes are decorated with `page_cache.cached(*tags)`; the cache key is
+the request path plus its sorted query string, and the tags name what the
+page shows ("venues", "venue:{venue_id}", ...). Under a conditional GET
+(see conditional.py) the key also holds the page's version, so a body
+cached before a change made elsewhere (another worker, an import, a CLI
+command) is never sent under the newer ETag. Write handlers call
+`page_cache.invalidate(*tags)` with the tags of the pages they change.
+
+CACHE_TYPE selects the backend: "memory" (per-process LRU with TTL),
+"redis" (any client with the redis-py get/set/delete/sadd/smembers/expire
+interface, so a local stand-in can replace a real server) or "null".
+"""
+import inspect
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from functools import wraps
+
+from flask import Response, g, request, session
+
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl, tags):
+        pass
+
+    def invalidate(self, tags):
+        return 0
+
+
+class MemoryBackend:
+    """ Thread-safe LRU of at most `maxsize` entries, each expiring after its
+    TTL."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._tags = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires, _ = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, tags):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, tags)
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.pop(tag, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisBackend:
+    """ Entries are plain keys with a TTL; each tag is a set of entry keys
+    that lives as long as its newest entry."""
+
+    def __init__(self, client, prefix="fyyur:page:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl, tags):
+        self.client.set(self.prefix + key, value, ex=ttl)
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            self.client.sadd(tag_key, key)
+            self.client.expire(tag_key, ttl)
+
+    def invalidate(self, tags):
+        keys = set()
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys |= {k.decode() if isinstance(k, bytes) else k
+                     for k in self.client.smembers(tag_key)}
+            self.client.delete(tag_key)
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+        return len(keys)
+
+
+class PageCache:
+    def __init__(self, app=None):
+        self.backend = NullBackend()
+        self.ttl = 0
+        self.hits = Counter()
+        self.misses = Counter()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.ttl = config["CACHE_TTL"]
+        if config["CACHE_TYPE"] == "memory":
+            self.backend = MemoryBackend(config["CACHE_MAXSIZE"])
+        elif config["CACHE_TYPE"] == "redis":
+            # Optional dependency, only needed for the redis backend.
+            import redis
+            self.backend = RedisBackend(redis.Redis.from_url(config["CACHE_REDIS_URL"]))
+        else:
+            self.backend = NullBackend()
+
+    @staticmethod
+    def key():
+        args = sorted(request.args.items(multi=True))
+        query = "&".join(f"{k}={v}" for k, v in args)
+        key = f"{request.path}?{query}"
+        version = g.get("version_tag")
+        return key if version is None else f"{key}#{version}"
+
+    def cached(self, *tags):
+        """ Cache the rendered body of a GET view. `tags` are formatted with
+        the view arguments, e.g. "venue:{venue_id}"."""
+        def decorator(view):
+            if inspect.iscoroutinefunction(view):
+                @wraps(view)
+                async def async_wrapper(**kwargs):
+                    key, hit = self._lookup()
+                    if hit is not None:
+                        return hit
+                    response = await view(**kwargs)
+                    return self._store(key, response, tags, kwargs)
+                return async_wrapper
+
+            @wraps(view)
+            def wrapper(**kwargs):
+                key, hit = self._lookup()
+                if hit is not None:
+                    return hit
+                return self._store(key, view(**kwargs), tags, kwargs)
+            return wrapper
+        return decorator
+
+    def _lookup(self):
+        """ (cache key, cached response) of this request; the key is None
+        when the request must not be cached."""
+        # Pages carrying flashed messages are personal, never cache them.
+        if request.method != "GET" or "_flashes" in session:
+            return None, None
+        key = self.key()
+        body = self.backend.get(key)
+        if body is not None:
+            self.hits[request.endpoint] += 1
+            return key, Response(body, mimetype="text/html")
+        self.misses[request.endpoint] += 1
+        return key, None
+
+    def _store(self, key, response, tags, kwargs):
+        if key is not None and isinstance(response, str):
+            self.backend.set(key, response.encode(), self.ttl,
+                             [tag.format(**kwargs) for tag in tags])
+        return response
+
+    def invalidate(self, *tags):
+        """ Drop every cached page carrying one of `tags`."""
+        return self.backend.invalidate(tags)
+
+    def stats(self):
+        endpoints = sorted(set(self.hits) | set(self.misses))
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "endpoints": {
+                endpoint: {"hits": self.hits[endpoint],
+                           "misses": self.misses[endpoint]}
+                for endpoint in endpoints
+            },
+        }
+
+
+page_cache = PageCache()
@@ -0,0 +1,75 @@
+""" Conditional GETs for pages with a cheap version lookup.
+
+    @app.route("/venues/<int:venue_id>")
+    @conditional(lambda venue_id: entity_version(Venue, venue_id))
+    def show_venue(venue_id): ...
+
+The validator runs before the view and returns a queries.Version (or None
+for a missing entity, which 404s). When the request's If-None-Match or
+If-Modified-Since still matches, a 304 is sent without running the view;
+otherwise the view's response gets the ETag and, for versions that have
+one (detail pages, not listings), the Last-Modified header. Async views
+take an async validator. The version is kept in `g.version_tag` so that
+the page cache only serves bodies rendered at that version.
+"""
+import hashlib
+import inspect
+from datetime import timezone
+from functools import wraps
+
+from flask import abort, g, make_response, request, session
+
+
+def conditional(validator):
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            # Async views, see async_views.py, have async validators.
+            @wraps(view)
+            async def async_wrapper(**kwargs):
+                if "_flashes" in session:
+                    return await view(**kwargs)
+                validators = validation(await validator(**kwargs))
+                if not_modified(*validators):
+                    return finish(make_response("", 304), *validators)
+                return finish(make_response(await view(**kwargs)), *validators)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(**kwargs):
+            # Pages carrying flashed messages must always be rendered.
+            if "_flashes" in session:
+                return view(**kwargs)
+            validators = validation(validator(**kwargs))
+            if not_modified(*validators):
+                return finish(make_response("", 304), *validators)
+            return finish(make_response(view(**kwargs)), *validators)
+        return wrapper
+    return decorator
+
+
+def validation(version):
+    """ (ETag, Last-Modified) of the requested page at `version`."""
+    if version is None:
+        abort(404)
+    g.version_tag = version.tag
+    # The same entity renders differently per page of shows.
+    etag = hashlib.md5(
+        f"{request.full_path}|{version.tag}".encode()).hexdigest()
+    # updated_at is naive local time, HTTP dates are second-precision UTC.
+    last_modified = version.last_modified and version.last_modified.replace(
+        microsecond=0).astimezone(timezone.utc)
+    return etag, last_modified
+
+
+def not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    since = request.if_modified_since
+    return bool(since and last_modified and last_modified <= since)
+
+
+def finish(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    return response
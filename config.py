@@ -15,3 +15,79 @@ SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI')
 SQLALCHEMY_TRACK_MODIFICATIONS = os.environ.get(
     'SQLALCHEMY_TRACK_MODIFICATIONS') == 'True'
 SQLALCHEMY_ECHO = os.environ.get('SQLALCHEMY_ECHO') == 'True'
+
+# Connection pool, see pool.py. Connections are checked with a ping before use
+# and replaced after DB_POOL_RECYCLE seconds.
+SQLALCHEMY_ENGINE_OPTIONS = {
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+    'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'True') == 'True',
+}
+
+# Statement timeout of request transactions in milliseconds (0 disables it),
+# overridable per endpoint, e.g. STATEMENT_TIMEOUTS="venues.search_venues=2000".
+DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 30000))
+STATEMENT_TIMEOUTS = {
+    endpoint.strip(): int(timeout)
+    for endpoint, timeout in (
+        item.split('=') for item in
+        os.environ.get('STATEMENT_TIMEOUTS', 'api.export=0').split(',') if item)
+}
+
+# Per-request query counts and timings, see instrumentation.py. A statement
+# repeated INSTRUMENTATION_N_PLUS_ONE times in one request is logged.
+INSTRUMENTATION = os.environ.get('INSTRUMENTATION', str(DEBUG)) == 'True'
+INSTRUMENTATION_N_PLUS_ONE = int(os.environ.get('INSTRUMENTATION_N_PLUS_ONE', 5))
+
+# Listing pages use keyset pagination; page size is capped to bound memory.
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 50))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 200))
+
+# Maximum number of ranked results returned by the search pages, and how many
+# full-text matches are ranked to pick them. Terms shorter than
+# SEARCH_PREFIX_LENGTH only match names starting with them.
+SEARCH_LIMIT = int(os.environ.get('SEARCH_LIMIT', 50))
+SEARCH_RANK_WINDOW = int(os.environ.get('SEARCH_RANK_WINDOW', 1000))
+SEARCH_PREFIX_LENGTH = int(os.environ.get('SEARCH_PREFIX_LENGTH', 3))
+
+# Raise on any relationship a query did not load eagerly, instead of lazy
+# loading it (see models.raise_on_lazy_load). Enable in CI to catch N+1
+# queries.
+RAISE_ON_LAZY_LOAD = os.environ.get('RAISE_ON_LAZY_LOAD') == 'True'
+
+# Rendered-page cache (see cache.py): "memory", "redis" or "null".
+CACHE_TYPE = os.environ.get('CACHE_TYPE', 'memory')
+CACHE_TTL = int(os.environ.get('CACHE_TTL', 60))
+CACHE_MAXSIZE = int(os.environ.get('CACHE_MAXSIZE', 1024))
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+# Jinja bytecode cache (see template_cache.py): "filesystem", "memory" or
+# "null". The filesystem cache defaults to a private directory under the
+# system temp dir. TEMPLATE_WARMUP compiles every template at startup.
+TEMPLATE_CACHE_TYPE = os.environ.get('TEMPLATE_CACHE_TYPE', 'filesystem')
+TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR') or None
+TEMPLATE_WARMUP = os.environ.get('TEMPLATE_WARMUP', 'True') == 'True'
+
+# Static assets (see assets.py): with STATIC_FINGERPRINTS, url_for("static")
+# resolves to the files built by `flask assets build`, when they exist, and
+# those are cached by clients for STATIC_MAX_AGE seconds.
+STATIC_FINGERPRINTS = os.environ.get('STATIC_FINGERPRINTS', 'True') == 'True'
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 365 * 24 * 3600))
+
+# Most ids one bulk delete request may name (see api.py).
+BULK_DELETE_LIMIT = int(os.environ.get('BULK_DELETE_LIMIT', 1000))
+
+# Rows per transaction for `flask fyyur import` (see importer.py).
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 5000))
+
+# Minutes a show occupies its venue and artist, see availability.py, and the
+# longest window /availability answers for.
+SHOW_DURATION = int(os.environ.get('SHOW_DURATION', 180))
+AVAILABILITY_MAX_DAYS = int(os.environ.get('AVAILABILITY_MAX_DAYS', 62))
+
+# ASGI mode (asgi.py): serve the read routes with the async views of
+# async_views.py, on ASGI_THREADS request threads.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'True') == 'True'
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 32))
@@ -0,0 +1,48 @@
+""" Venue and Artist deletion.
+
+Shows reference their venue and artist with ON DELETE CASCADE, so deleting
+venues or artists is one DELETE statement however many shows they have;
+PostgreSQL removes the shows through the (venue_id, start_time) and
+(artist_id, start_time) indexes. The relationships use passive_deletes,
+so the ORM never loads shows to delete them either.
+"""
+from collections import namedtuple
+
+from sqlalchemy import delete
+
+from cache import page_cache
+from models import db, Venue, Artist, Show
+from stats import discount
+
+# The foreign key on Show of each side, and the other side with its key.
+SIDES = {
+    Venue: (Show.venue_id, Artist, Show.artist_id),
+    Artist: (Show.artist_id, Venue, Show.venue_id),
+}
+
+Deleted = namedtuple("Deleted", ["ids", "shows", "counterpart_ids"])
+
+
+def delete_entities(model, ids):
+    """ Delete the venues or artists `ids` and, by cascade, their shows,
+    taking those shows off the counters of their counterparts first. Runs in
+    the caller's transaction and returns the Deleted ids, number of shows
+    and counterpart ids."""
+    fk, counterpart, counterpart_fk = SIDES[model]
+    discounted = discount(counterpart, counterpart_fk, fk.in_(ids))
+    deleted = db.session.execute(
+        delete(model).where(model.id.in_(ids)).returning(model.id),
+        execution_options={"synchronize_session": False}).scalars().all()
+    return Deleted(sorted(deleted), sum(shows for _, shows in discounted),
+                   sorted(id for id, _ in discounted))
+
+
+def invalidate_deleted(model, deleted):
+    """ Drop the cached pages showing the deleted entities or their shows."""
+    name = model.__name__.lower()
+    counterpart = SIDES[model][1].__name__.lower()
+    # The venues listing shows upcoming show counts, the artists one does not.
+    page_cache.invalidate(
+        "venues", "shows", *(["artists"] if model is Artist else []),
+        *[f"{name}:{id}" for id in deleted.ids],
+        *[f"{counterpart}:{id}" for id in deleted.counterpart_ids])
@@ -0,0 +1,62 @@
+""" View payloads: immutable named tuples built from row tuples.
+
+Pages and the API render these instead of ORM instances. A named tuple
+has no per-instance __dict__ and no instance state, holds no reference to
+the session, and is built straight from a query row (`_make`), so
+building one costs about as much as the row itself. They also serialize
+with `_asdict()` and attribute access, see api.serialize.
+"""
+from collections import namedtuple
+from operator import attrgetter
+
+from models import db, Venue, Artist
+
+# Columns of a venue or artist that its detail page renders.
+DETAIL_COLUMNS = {
+    Venue: (Venue.id, Venue.name, Venue.genres, Venue.address, Venue.city,
+            Venue.state, Venue.phone, Venue.website, Venue.facebook_link,
+            Venue.seeking_talent, Venue.seeking_description, Venue.image_link),
+    Artist: (Artist.id, Artist.name, Artist.genres, Artist.city, Artist.state,
+             Artist.phone, Artist.website, Artist.facebook_link,
+             Artist.seeking_venue, Artist.seeking_description,
+             Artist.image_link),
+}
+SHOW_COUNTS = ["upcoming_shows", "past_shows", "upcoming_shows_count",
+               "past_shows_count"]
+
+VenueDetail = namedtuple(
+    "VenueDetail", [c.key for c in DETAIL_COLUMNS[Venue]] + SHOW_COUNTS)
+ArtistDetail = namedtuple(
+    "ArtistDetail", [c.key for c in DETAIL_COLUMNS[Artist]] + SHOW_COUNTS)
+# A show on a venue's page names its artist, and the other way round.
+VenueShow = namedtuple(
+    "VenueShow", ["artist_id", "artist_name", "artist_image_link", "start_time"])
+ArtistShow = namedtuple(
+    "ArtistShow", ["venue_id", "venue_name", "venue_image_link", "start_time"])
+ListedShow = namedtuple(
+    "ListedShow", ["venue_id", "venue_name", "artist_id", "artist_name",
+                   "artist_image_link", "start_time"])
+SearchHit = namedtuple("SearchHit", ["id", "name", "num_upcoming_shows"])
+
+DETAILS = {Venue: (VenueDetail, VenueShow), Artist: (ArtistDetail, ArtistShow)}
+
+
+def rows_to(dto, rows):
+    """ One `dto` per row, from the row attributes named like its fields."""
+    fields = attrgetter(*dto._fields)
+    make = dto._make
+    return [make(fields(row)) for row in rows]
+
+
+def detail_row(model, entity_id, session=None):
+    """ The columns of a venue or artist its detail page renders, or None."""
+    return (session or db.session).query(*DETAIL_COLUMNS[model]).filter(
+        model.id == entity_id).one_or_none()
+
+
+def detail(model, row, upcoming_page, past_page, counts):
+    """ VenueDetail or ArtistDetail of a detail_row, its pages of
+    queries.show_history and its queries.show_counts."""
+    dto, show = DETAILS[model]
+    return dto(*row, rows_to(show, upcoming_page.items),
+               rows_to(show, past_page.items), *counts)
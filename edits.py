@@ -0,0 +1,108 @@
+""" Venue and Artist edits with optimistic concurrency.
+
+Every Venue and Artist carries a `version`, which the edit forms send back
+in a hidden field (and API clients in the PATCH body). An edit is one
+
+    UPDATE ... SET <changed columns>, version = version + 1
+    WHERE id = :id AND version = :version
+
+so an edit made after someone else's, from a stale form, matches no row
+and is reported as a conflict instead of silently overwriting it. Forms
+are prefilled from `edit_row`, a projection of the edited columns.
+"""
+from collections import namedtuple
+
+from sqlalchemy import update
+
+from cache import page_cache
+from deletes import SIDES
+from rules import ARTIST_RULES, COLUMN_NAMES, VENUE_RULES
+from models import db, Venue, Artist
+from queries import counterpart_ids, touch
+
+# Form field -> column, for the fields of the edit forms.
+FIELDS = {
+    model: {
+        field: getattr(model, COLUMN_NAMES.get(field, field))
+        for field in rules.fields
+    }
+    for model, rules in ((Venue, VENUE_RULES), (Artist, ARTIST_RULES))
+}
+RULES = {Venue: VENUE_RULES, Artist: ARTIST_RULES}
+# Columns the counterparts' detail pages show.
+SHOWN_BY_COUNTERPARTS = frozenset(["name", "image_link"])
+
+Edited = namedtuple("Edited", ["version", "counterpart_ids"])
+
+
+class EditConflict(Exception):
+    """ The entity changed since the editor read `version`."""
+
+    def __init__(self, version):
+        super().__init__(f"Edited concurrently, now at version {version}")
+        self.version = version
+
+
+def edit_row(model, entity_id):
+    """ id, version and the form fields of a venue or artist, labelled by
+    field name, or None."""
+    return db.session.query(
+        model.id, model.version,
+        *[column.label(field) for field, column in FIELDS[model].items()],
+    ).filter(model.id == entity_id).one_or_none()
+
+
+def column_values(model, values):
+    """ The form fields present in `values`, cleaned like the form does (see
+    rules.Validator.clean) and keyed by column."""
+    cleaned = RULES[model].clean(values)
+    return {column.key: cleaned[field]
+            for field, column in FIELDS[model].items() if field in values}
+
+
+def changes(model, row, values):
+    """ column_values of `values` that differ from the edit_row `row`."""
+    current = column_values(model, row._asdict())
+    return {column: value
+            for column, value in column_values(model, values).items()
+            if value != current[column]}
+
+
+def update_entity(model, entity_id, version, values):
+    """ Set the column `values` of a venue or artist still at `version` in
+    one UPDATE. Returns the new version, or None when no row matched."""
+    return db.session.execute(
+        update(model)
+        .where(model.id == entity_id, model.version == version)
+        .values(version=model.version + 1, **values)
+        .returning(model.version),
+        execution_options={"synchronize_session": False}).scalar()
+
+
+def save_edit(model, entity_id, version, values):
+    """ Apply the column `values` to a venue or artist read at `version`, in
+    the caller's transaction. Returns the new version and the counterparts
+    whose pages changed too; raises EditConflict on a version mismatch and
+    LookupError on a missing id."""
+    new_version = update_entity(model, entity_id, version, values)
+    if new_version is None:
+        current = db.session.query(model.version).filter(
+            model.id == entity_id).scalar()
+        if current is None:
+            raise LookupError(f"No {model.__name__} {entity_id}")
+        raise EditConflict(current)
+    ids = set()
+    if SHOWN_BY_COUNTERPARTS.intersection(values):
+        fk, counterpart, counterpart_fk = SIDES[model]
+        ids = counterpart_ids(fk, entity_id, counterpart_fk)
+        touch(counterpart, ids)
+    return Edited(new_version, ids)
+
+
+def invalidate_edited(model, entity_id, edited):
+    """ Drop the cached pages showing the edited entity, after commit."""
+    name = model.__name__.lower()
+    counterpart = SIDES[model][1].__name__.lower()
+    page_cache.invalidate(
+        f"{name}s", "shows", f"{name}:{entity_id}",
+        *[f"{counterpart}:{id}" for id in edited.counterpart_ids])
@@ -5,14 +5,18 @@ from fabric.contrib.console import confirm
 
 
 def test():
+	# database tests run when TEST_DATABASE_URI is set, see tests/conftest.py
 	with settings(warn_only=True):
-		result = local(
-			"python test_tasks.py -v && python test_users.py -v", capture=True
-		)
+		result = local("python -m pytest -q", capture=True)
 	if result.failed and not confirm("Tests failed. Continue?"):
 		abort("Aborted at user request.")
 
 
+def bench():
+	# smoke benchmark: every route answers without error on BENCHMARK_DATABASE_URI
+	local("python -m benchmarks.routes --requests 5")
+
+
 def commit():
 	message = raw_input("Enter a git commit message: ")
 	local("git add . && git commit -am '{}'".format(message))
@@ -0,0 +1,39 @@
+from datetime import datetime
+from functools import lru_cache
+
+# babel and dateutil are imported on first use, not at worker startup.
+
+# Named formats of the `datetime` Jinja filter.
+FORMATS = {
+    "full": "EEEE MMMM, d, y 'at' h:mma",
+    "medium": "EE MM, dd, y h:mma",
+}
+# Other CLDR format names are left to babel.
+CLDR_FORMATS = ("short", "long")
+
+
+@lru_cache(maxsize=None)
+def compiled_pattern(format, locale):
+    """ The babel pattern and Locale for a (format, locale) pair, compiled
+    once per process."""
+    from babel import Locale
+    from babel.dates import parse_pattern
+    return parse_pattern(FORMATS.get(format, format)), Locale.parse(locale)
+
+
+def parse(value):
+    import dateutil.parser
+    return dateutil.parser.parse(value)
+
+
+def format_datetime(value, format="medium", locale="en"):
+    """ Format a datetime with a named or babel format. Strings are still
+    accepted, but are parsed first."""
+    if not isinstance(value, datetime):
+        value = parse(value)
+    if format in CLDR_FORMATS:
+        import babel.dates
+        return babel.dates.format_datetime(value, format, locale=locale)
+    pattern, locale = compiled_pattern(format, locale)
+    return pattern.apply(value, locale)
+
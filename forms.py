@@ -1,39 +1,40 @@
 from datetime import datetime
-from enum import Enum
-import re
 from flask_wtf import Form, FlaskForm
-from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField
+from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField, HiddenField
 from wtforms.validators import DataRequired, AnyOf, URL, Regexp
 
 from enums import Genre, State
+from rules import ARTIST_RULES, SHOW_RULES, VENUE_RULES
 
 
-def is_valid_phone(number):
-    """ Validate phone numbers like:
-    1234567890 - no space
-    123.456.7890 - dot separator
-    123-456-7890 - dash separator
-    123 456 7890 - space separator
+class ValidatedForm(Form):
+    """ Runs the field validators, then the form's `rules` on the fields
+    that passed them, so every error is reported at once."""
+    rules = None
 
-    Patterns:
-    000 = [0-9]{3}
-    0000 = [0-9]{4}
-    -.  = ?[-. ]
+    def validate(self, **kwargs):
+        # `**kwargs` to match the method's signature in the `FlaskForm` class.
+        validated = FlaskForm.validate(self)
+        _, errors = self.rules.validate(self.data)
+        for field, messages in errors.items():
+            if not self[field].errors:
+                self[field].errors.extend(messages)
+                validated = False
+        return validated
 
-    Note: (? = optional) - Learn more: https://regex101.com/
-    """
-    regex = re.compile('^\(?([0-9]{3})\)?[-. ]?([0-9]{3})[-. ]?([0-9]{4})$')
-    return regex.match(number)
 
+class ShowForm(ValidatedForm):
+    rules = SHOW_RULES
 
-class ShowForm(Form):
     artist_id = StringField("artist_id")
     venue_id = StringField("venue_id")
     start_time = DateTimeField("start_time", validators=[
                                DataRequired()], default=datetime.today())
 
 
-class VenueForm(Form):
+class VenueForm(ValidatedForm):
+    rules = VENUE_RULES
+
     name = StringField("name", validators=[DataRequired()])
     city = StringField("city", validators=[DataRequired()])
     state = SelectField(
@@ -57,32 +58,13 @@ class VenueForm(Form):
 
     seeking_description = StringField("seeking_description")
 
-    def validate(self, **kwargs):
-        # `**kwargs` to match the method's signature in the `FlaskForm` class.
-        """Define a custom validate method in your Form:"""
-        validated = FlaskForm.validate(self)
-
-        if not validated:
-            return False
-
-        if not is_valid_phone(self.phone.data):
-            self.phone.errors.append(
-                'Invalid phone format (should be xxx-xxx-xxxx).')
-            return False
-
-        if not set(self.genres.data).issubset(dict(Genre.choices()).keys()):
-            self.genres.errors.append('Invalid genres.')
-            return False
+    # Version the edit form was read at, see edits.py
+    version = HiddenField("version")
 
-        if self.state.data not in dict(State.choices()).keys():
-            self.state.errors.append('Invalid state.')
-            return False
 
-        # if pass validation
-        return True
+class ArtistForm(ValidatedForm):
+    rules = ARTIST_RULES
 
-
-class ArtistForm(Form):
     name = StringField("name", validators=[DataRequired()])
     city = StringField("city", validators=[DataRequired()])
     state = SelectField(
@@ -110,26 +92,5 @@ class ArtistForm(Form):
 
     seeking_description = StringField("seeking_description")
 
-    def validate(self, **kwargs):
-        # `**kwargs` to match the method's signature in the `FlaskForm` class.
-        """Define a custom validate method in your Form:"""
-        validated = FlaskForm.validate(self)
-
-        if not validated:
-            return False
-
-        if not is_valid_phone(self.phone.data):
-            self.phone.errors.append(
-                'Invalid phone format (should be xxx-xxx-xxxx).')
-            return False
-
-        if not set(self.genres.data).issubset(dict(Genre.choices()).keys()):
-            self.genres.errors.append('Invalid genres.')
-            return False
-
-        if self.state.data not in dict(State.choices()).keys():
-            self.state.errors.append('Invalid state.')
-            return False
-
-        # if pass validation
-        return True
+    # Version the edit form was read at, see edits.py
+    version = HiddenField("version")
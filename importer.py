@@ -0,0 +1,292 @@
+""" Bulk import of venues, artists and shows.
+
+    flask fyyur import venues venues.csv
+    flask fyyur import shows shows.ndjson --chunk-size 10000 --rejects rejects.ndjson
+
+Rows use the field names of the create forms (`website_link`, `genres`, ...)
+and are validated with the forms' rules (see rules.Validator); in CSV files
+`genres` is a comma separated list. `start_time` is an ISO 8601 local time,
+e.g. '2019-05-21 21:30:00' or '2019-05-21T21:30:00' as /api/v1/shows/export
+writes it. Invalid rows, e.g. a number for a phone, are reported as rejects
+and the import goes on. Valid rows are loaded in chunks, one transaction
+each: they are COPYed into a temporary staging table and merged into the
+target table on its natural key, so running an import twice updates rows
+instead of duplicating them.
+
+Natural keys: venues and artists (name, city, state), shows (venue_id,
+artist_id, start_time).
+"""
+import csv
+import io
+import json
+import sys
+from collections import namedtuple
+from datetime import datetime
+from itertools import islice
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import text
+
+from rules import VENUE_RULES, ARTIST_RULES, SHOW_RULES
+from models import db, Venue, Artist, Show
+from stats import COUNTED, refresh
+
+# columns: table column -> form field. references: column -> model the id
+# must exist in.
+Kind = namedtuple("Kind", ["model", "rules", "columns", "key", "references"])
+
+KINDS = {
+    "venues": Kind(
+        model=Venue,
+        rules=VENUE_RULES,
+        columns={
+            "name": "name", "city": "city", "state": "state",
+            "address": "address", "phone": "phone", "genres": "genres",
+            "image_link": "image_link", "facebook_link": "facebook_link",
+            "website": "website_link", "seeking_talent": "seeking_talent",
+            "seeking_description": "seeking_description",
+        },
+        key=("name", "city", "state"),
+        references={},
+    ),
+    "artists": Kind(
+        model=Artist,
+        rules=ARTIST_RULES,
+        columns={
+            "name": "name", "city": "city", "state": "state",
+            "phone": "phone", "genres": "genres",
+            "image_link": "image_link", "facebook_link": "facebook_link",
+            "website": "website_link", "seeking_venue": "seeking_venue",
+            "seeking_description": "seeking_description",
+        },
+        key=("name", "city", "state"),
+        references={},
+    ),
+    "shows": Kind(
+        model=Show,
+        rules=SHOW_RULES,
+        columns={
+            "venue_id": "venue_id", "artist_id": "artist_id",
+            "start_time": "start_time",
+        },
+        key=("venue_id", "artist_id", "start_time"),
+        references={"venue_id": Venue, "artist_id": Artist},
+    ),
+}
+
+Result = namedtuple("Result", ["inserted", "updated", "rejects"])
+
+
+def read_rows(stream, format):
+    """ Yield (line number, row dict or None, parse error or None)."""
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for line, raw in enumerate(stream, 1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as e:
+            yield line, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line, None, "Expected a JSON object."
+            continue
+        yield line, row, None
+
+
+def validate(kind, rows):
+    """ Yield (column values, None) for each valid row and (None, errors)
+    for each invalid one."""
+    for values, errors in kind.rules.validate_many(rows):
+        if errors:
+            yield None, errors
+        else:
+            yield {column: values[field]
+                   for column, field in kind.columns.items()}, None
+
+
+def staging_table(kind):
+    table = kind.model.__table__
+    return db.Table(
+        "import_staging", db.MetaData(),
+        db.Column("line", db.Integer),
+        *[db.Column(column, table.c[column].type) for column in kind.columns],
+        prefixes=["TEMPORARY"], postgresql_on_commit="DROP",
+    )
+
+
+def copy_value(value):
+    """ A value in PostgreSQL's COPY CSV format; empty means NULL."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(" ")
+    if isinstance(value, list):
+        items = ('"' + item.replace("\\", "\\\\").replace('"', '\\"') + '"'
+                 for item in value)
+        return "{" + ",".join(items) + "}"
+    return value
+
+
+def stage(staging, rows):
+    """ Load (line, values) pairs into the staging table: COPY on psycopg2,
+    one batched executemany on other drivers."""
+    connection = db.session.connection()
+    staging.create(connection)
+    columns = [column.name for column in staging.columns]
+    cursor = connection.connection.cursor()
+    if hasattr(cursor, "copy_expert"):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for line, values in rows:
+            writer.writerow([line] + [copy_value(values[c]) for c in columns[1:]])
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {staging.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer)
+    else:
+        connection.execute(staging.insert(),
+                           [dict(values, line=line) for line, values in rows])
+    cursor.close()
+
+
+def load_chunk(kind, rows):
+    """ Merge (line, values) pairs into the target table, in the session's
+    transaction. Rows referencing missing entities are rejected."""
+    staging = staging_table(kind)
+    stage(staging, rows)
+
+    rejects = []
+    for column, model in kind.references.items():
+        missing = db.session.execute(text(f"""
+            DELETE FROM {staging.name} s
+            WHERE NOT EXISTS (SELECT 1 FROM "{model.__tablename__}" t
+                              WHERE t.id = s.{column})
+            RETURNING line
+        """))
+        rejects += [(line, {kind.columns[column]: [
+            f"No {model.__tablename__} with this id."]}) for line, in missing]
+
+    target = f'"{kind.model.__tablename__}"'
+    columns = list(kind.columns)
+    key = ", ".join(kind.key)
+    matches = " AND ".join(f"t.{column} = s.{column}" for column in kind.key)
+    # Within a chunk, the last row for a natural key wins.
+    deduped = (f"(SELECT DISTINCT ON ({key}) * FROM {staging.name} "
+               f"ORDER BY {key}, line DESC) s")
+
+    updated = 0
+    changed = [column for column in columns if column not in kind.key]
+    # Edit forms opened before the import must not overwrite it, see edits.py.
+    version = ("version = t.version + 1,"
+               if hasattr(kind.model, "version") else "")
+    if changed:
+        updated = db.session.execute(text(f"""
+            UPDATE {target} t
+            SET {", ".join(f"{column} = s.{column}" for column in changed)},
+                {version}
+                updated_at = localtimestamp
+            FROM {deduped}
+            WHERE {matches}
+              AND ({", ".join(f"t.{column}" for column in changed)})
+                  IS DISTINCT FROM ({", ".join(f"s.{column}" for column in changed)})
+        """)).rowcount
+    inserted = db.session.execute(text(f"""
+        INSERT INTO {target} ({", ".join(columns)})
+        SELECT {", ".join(f"s.{column}" for column in columns)}
+        FROM {deduped}
+        WHERE NOT EXISTS (SELECT 1 FROM {target} t WHERE {matches})
+    """)).rowcount
+
+    if kind.model is Show and inserted:
+        for model, fk in COUNTED:
+            ids = {values[fk.key] for _, values in rows}
+            refresh(model, fk, model.id.in_(ids))
+    return Result(inserted, updated, rejects)
+
+
+def import_rows(kind, rows, chunk_size, progress=None):
+    """ Validate and load (line, row, parse error) triples, committing every
+    `chunk_size` rows. Calls `progress(rows read, totals)` after each chunk."""
+    inserted = updated = read = 0
+    rejects = []
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            break
+        read += len(batch)
+        parsed = []
+        for line, row, error in batch:
+            if error:
+                rejects.append((line, {"row": [error]}))
+            else:
+                parsed.append((line, row))
+        chunk = []
+        results = validate(kind, (row for _, row in parsed))
+        for (line, _), (values, errors) in zip(parsed, results):
+            if errors:
+                rejects.append((line, errors))
+            else:
+                chunk.append((line, values))
+        if chunk:
+            try:
+                result = load_chunk(kind, chunk)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            inserted += result.inserted
+            updated += result.updated
+            rejects += sorted(result.rejects)
+        if progress is not None:
+            progress(read, Result(inserted, updated, rejects))
+    return Result(inserted, updated, rejects)
+
+
+fyyur_cli = AppGroup("fyyur", help="Fyyur data management.")
+
+
+@fyyur_cli.command("import")
+@click.argument("kind", type=click.Choice(list(KINDS)))
+@click.argument("source", type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option("--format", "format", type=click.Choice(["csv", "ndjson"]),
+              help="Input format, by default from the file extension.")
+@click.option("--chunk-size", type=int, help="Rows per transaction.")
+@click.option("--rejects", "rejects_path", type=click.Path(dir_okay=False),
+              help="Write rejected rows to this NDJSON file instead of stderr.")
+def import_command(kind, source, format, chunk_size, rejects_path):
+    """Import venues, artists or shows from a CSV or NDJSON file."""
+    format = format or ("csv" if source.lower().endswith(".csv") else "ndjson")
+    chunk_size = chunk_size or current_app.config["IMPORT_CHUNK_SIZE"]
+
+    def progress(read, result):
+        click.echo(f"{read} rows read: {result.inserted} inserted, "
+                   f"{result.updated} updated, {len(result.rejects)} rejected")
+
+    stream = sys.stdin if source == "-" else open(source, newline="", encoding="utf-8")
+    try:
+        result = import_rows(KINDS[kind], read_rows(stream, format),
+                             chunk_size, progress)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    if rejects_path:
+        with open(rejects_path, "w", encoding="utf-8") as out:
+            for line, errors in result.rejects:
+                out.write(json.dumps({"line": line, "errors": errors}) + "\n")
+    else:
+        for line, errors in result.rejects:
+            message = "; ".join(f"{field}: {', '.join(map(str, errs))}"
+                                for field, errs in errors.items())
+            click.echo(f"line {line}: {message}", err=True)
+    click.echo(f"Imported {kind}: {result.inserted} inserted, "
+               f"{result.updated} updated, {len(result.rejects)} rejected.")
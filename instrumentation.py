@@ -0,0 +1,174 @@
+""" Per-request SQL and template instrumentation.
+
+For every request, counts the queries and rows loaded and times the
+database and template rendering, hooking SQLAlchemy cursor events and
+Flask's template signals. Results go to a `Server-Timing` header (shown
+by browser dev tools) and to per-endpoint aggregates served by
+`/debug/timings`. An identical statement run INSTRUMENTATION_N_PLUS_ONE
+times or more in one request is logged as an N+1 suspect.
+
+Enabled by INSTRUMENTATION, which defaults to DEBUG. `/debug/timings`,
+`/pool/status` and `/cache/stats` are only served when it is, or in debug
+mode.
+"""
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from flask import (
+    before_render_template, current_app, g, has_app_context, request,
+    template_rendered)
+from sqlalchemy import event
+
+from pool import percentile
+
+# Number of recent requests per endpoint the percentiles are computed over.
+WINDOW = 1000
+
+
+class RequestTimings:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.statements = Counter()
+        self._render_starts = []
+
+
+class Instrumentation:
+    def __init__(self, app=None, db=None):
+        self.enabled = False
+        self.threshold = 0
+        self.requests = defaultdict(lambda: deque(maxlen=WINDOW))
+        self.suspects = Counter()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.enabled = app.config["INSTRUMENTATION"]
+        self.threshold = app.config["INSTRUMENTATION_N_PLUS_ONE"]
+        if not self.enabled:
+            return
+        with app.app_context():
+            self.watch(db.engine)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def watch(self, engine):
+        """ Count the queries run on `engine` too (a sync Engine). Engines
+        already watched, e.g. by an earlier init_app, are left as they are."""
+        listeners = (
+            ("before_cursor_execute", self._before_execute),
+            ("after_cursor_execute", self._after_execute),
+            ("handle_error", self._execute_failed),
+        )
+        for name, listener in listeners:
+            if not event.contains(engine, name, listener):
+                event.listen(engine, name, listener)
+
+    @staticmethod
+    def current():
+        return g.get("timings") if has_app_context() else None
+
+    def _start(self):
+        g.timings = RequestTimings()
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        timings = self.current()
+        if timings is None:
+            return
+        timings.queries += 1
+        timings.db_time += elapsed
+        timings.rows += max(cursor.rowcount, 0)
+        timings.statements[statement] += 1
+
+    def _execute_failed(self, context):
+        # after_cursor_execute does not run for a failed statement.
+        connection = context.connection
+        if connection is not None and context.execution_context is not None:
+            starts = connection.info.get("query_start")
+            if starts:
+                starts.pop()
+
+    def _before_render(self, sender, template, context, **extra):
+        timings = self.current()
+        if timings is not None:
+            timings._render_starts.append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        timings = self.current()
+        if timings is not None and timings._render_starts:
+            elapsed = time.perf_counter() - timings._render_starts.pop()
+            # Nested renders are already part of the outer one.
+            if not timings._render_starts:
+                timings.template_time += elapsed
+
+    def _finish(self, response):
+        timings = self.current()
+        if timings is None:
+            return response
+        total = time.perf_counter() - timings.start
+        response.headers["Server-Timing"] = ", ".join([
+            f'db;dur={timings.db_time * 1000:.2f};desc="{timings.queries} queries, {timings.rows} rows"',
+            f"tpl;dur={timings.template_time * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ])
+
+        suspects = [(statement, count) for statement, count
+                    in timings.statements.items() if count >= self.threshold]
+        endpoint = request.endpoint or "<unmatched>"
+        for statement, count in suspects:
+            current_app.logger.warning(
+                "Possible N+1 on %s: statement ran %d times: %s",
+                endpoint, count, " ".join(statement.split())[:200])
+        with self._lock:
+            self.requests[endpoint].append(
+                (total, timings.db_time, timings.template_time,
+                 timings.queries, timings.rows))
+            if suspects:
+                self.suspects[endpoint] += 1
+        return response
+
+    def stats(self):
+        with self._lock:
+            requests = {endpoint: list(samples)
+                        for endpoint, samples in self.requests.items()}
+            suspects = dict(self.suspects)
+
+        def summary(values, scale=1000):
+            return {
+                name: round(value * scale, 3)
+                for name, value in (
+                    ("p50", percentile(values, 0.5)),
+                    ("p95", percentile(values, 0.95)),
+                    ("p99", percentile(values, 0.99)),
+                )
+            }
+
+        return {
+            "enabled": self.enabled,
+            "endpoints": {
+                endpoint: {
+                    "requests": len(samples),
+                    "total_ms": summary([s[0] for s in samples]),
+                    "db_ms": summary([s[1] for s in samples]),
+                    "template_ms": summary([s[2] for s in samples]),
+                    "queries": summary([s[3] for s in samples], scale=1),
+                    "rows": summary([s[4] for s in samples], scale=1),
+                    "n_plus_one_requests": suspects.get(endpoint, 0),
+                }
+                for endpoint, samples in sorted(requests.items())
+            },
+        }
+
+
+instrumentation = Instrumentation()
@@ -0,0 +1,27 @@
+"""version columns on Venue and Artist for optimistic concurrency
+
+Revision ID: 0a7d3e5b9c12
+Revises: f4c8b2d6a931
+Create Date: 2026-10-17 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7d3e5b9c12'
+down_revision = 'f4c8b2d6a931'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('Venue', 'Artist'):
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False,
+                                       server_default='1'))
+
+
+def downgrade():
+    for table in ('Venue', 'Artist'):
+        op.drop_column(table, 'version')
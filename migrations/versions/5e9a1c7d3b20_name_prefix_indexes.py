@@ -0,0 +1,30 @@
+"""lower(name) prefix indexes on Venue and Artist for short search terms
+
+The "C" collation lets a LIKE 'prefix%' use the index and return names in
+index order.
+
+Revision ID: 5e9a1c7d3b20
+Revises: 0a7d3e5b9c12
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9a1c7d3b20'
+down_revision = '0a7d3e5b9c12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE INDEX ix_venue_name_prefix ON "Venue" '
+               '((lower(name) COLLATE "C"), id)')
+    op.execute('CREATE INDEX ix_artist_name_prefix ON "Artist" '
+               '((lower(name) COLLATE "C"), id)')
+
+
+def downgrade():
+    op.drop_index('ix_artist_name_prefix', table_name='Artist')
+    op.drop_index('ix_venue_name_prefix', table_name='Venue')
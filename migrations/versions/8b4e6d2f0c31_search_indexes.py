@@ -0,0 +1,52 @@
+"""full-text search vectors on Venue and Artist
+
+Revision ID: 8b4e6d2f0c31
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d2f0c31'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # array_to_string() is only STABLE, so the search document is wrapped in
+    # an IMMUTABLE function that generated columns are allowed to call.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION fyyur_search_document(name text, city text, genres text[])
+        RETURNS tsvector
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$
+            SELECT setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(city, '')), 'B')
+                || setweight(to_tsvector('simple',
+                       coalesce(array_to_string(genres, ' '), '')), 'C')
+        $$
+    """)
+    for table in ('Venue', 'Artist'):
+        op.add_column(table, sa.Column(
+            'search_vector', postgresql.TSVECTOR(),
+            sa.Computed('fyyur_search_document(name, city, genres)', persisted=True),
+            nullable=True))
+    op.create_index('ix_venue_search', 'Venue', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+    op.create_index('ix_artist_search', 'Artist', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_artist_search', table_name='Artist',
+                  postgresql_using='gin')
+    op.drop_index('ix_venue_search', table_name='Venue',
+                  postgresql_using='gin')
+    op.drop_column('Artist', 'search_vector')
+    op.drop_column('Venue', 'search_vector')
+    op.execute("DROP FUNCTION fyyur_search_document(text, text, text[])")
@@ -0,0 +1,27 @@
+"""natural key indexes on Venue and Artist for bulk imports
+
+Revision ID: a4d8f2c6e915
+Revises: e2b9c4a8f613
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d8f2c6e915'
+down_revision = 'e2b9c4a8f613'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_venue_natural_key', 'Venue',
+                    ['name', 'city', 'state'], unique=False)
+    op.create_index('ix_artist_natural_key', 'Artist',
+                    ['name', 'city', 'state'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_artist_natural_key', table_name='Artist')
+    op.drop_index('ix_venue_natural_key', table_name='Venue')
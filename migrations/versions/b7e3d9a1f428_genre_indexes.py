@@ -0,0 +1,29 @@
+"""GIN indexes on Venue and Artist genres
+
+Revision ID: b7e3d9a1f428
+Revises: a4d8f2c6e915
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3d9a1f428'
+down_revision = 'a4d8f2c6e915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_venue_genres', 'Venue', ['genres'],
+                    unique=False, postgresql_using='gin')
+    op.create_index('ix_artist_genres', 'Artist', ['genres'],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_artist_genres', table_name='Artist',
+                  postgresql_using='gin')
+    op.drop_index('ix_venue_genres', table_name='Venue',
+                  postgresql_using='gin')
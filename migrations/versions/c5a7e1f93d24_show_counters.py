@@ -0,0 +1,48 @@
+"""denormalized show counters on Venue and Artist
+
+Revision ID: c5a7e1f93d24
+Revises: 8b4e6d2f0c31
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a7e1f93d24'
+down_revision = '8b4e6d2f0c31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table, fk in (('Venue', 'venue_id'), ('Artist', 'artist_id')):
+        op.add_column(table, sa.Column('upcoming_shows_count', sa.Integer(),
+                                       server_default='0', nullable=False))
+        op.add_column(table, sa.Column('past_shows_count', sa.Integer(),
+                                       server_default='0', nullable=False))
+        op.add_column(table, sa.Column('next_show_time', sa.DateTime(),
+                                       nullable=True))
+        # Backfill from the existing shows.
+        op.execute(f"""
+            UPDATE "{table}" AS t SET
+                upcoming_shows_count = s.upcoming,
+                past_shows_count = s.past,
+                next_show_time = s.next_show_time
+            FROM (
+                SELECT {fk} AS id,
+                       count(*) FILTER (WHERE start_time > localtimestamp) AS upcoming,
+                       count(*) FILTER (WHERE start_time <= localtimestamp) AS past,
+                       min(start_time) FILTER (WHERE start_time > localtimestamp) AS next_show_time
+                FROM "Show" GROUP BY {fk}
+            ) AS s
+            WHERE t.id = s.id
+        """)
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        op.drop_column(table, 'next_show_time')
+        op.drop_column(table, 'past_shows_count')
+        op.drop_column(table, 'upcoming_shows_count')
@@ -0,0 +1,74 @@
+"""Show lookup indexes, venue area index, drop the unused Shows table
+
+Revision ID: d3f6a8c2b517
+Revises: b7e3d9a1f428
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f6a8c2b517'
+down_revision = 'b7e3d9a1f428'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_show_venue_start', 'Show',
+                    ['venue_id', 'start_time'], unique=False)
+    op.create_index('ix_show_artist_start', 'Show',
+                    ['artist_id', 'start_time'], unique=False)
+    op.create_index('ix_show_start', 'Show',
+                    ['start_time', 'id'], unique=False)
+    op.create_index('ix_venue_area', 'Venue',
+                    ['state', 'city', 'id'], unique=False)
+
+    # "Shows" duplicated "Show" and was never written by the app; keep any
+    # rows it does hold before dropping it.
+    op.execute("""
+        INSERT INTO "Show" (start_time, artist_id, venue_id)
+        SELECT s.start_time, s.artist_id, s.venue_id FROM "Shows" s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM "Show" t
+            WHERE t.venue_id = s.venue_id AND t.artist_id = s.artist_id
+              AND t.start_time = s.start_time)
+    """)
+    # Recount the counters (see c5a7e1f93d24) of the venues and artists of
+    # the copied shows.
+    for table, fk in (('Venue', 'venue_id'), ('Artist', 'artist_id')):
+        op.execute(f"""
+            UPDATE "{table}" AS t SET
+                upcoming_shows_count = s.upcoming,
+                past_shows_count = s.past,
+                next_show_time = s.next_show_time
+            FROM (
+                SELECT {fk} AS id,
+                       count(*) FILTER (WHERE start_time > localtimestamp) AS upcoming,
+                       count(*) FILTER (WHERE start_time <= localtimestamp) AS past,
+                       min(start_time) FILTER (WHERE start_time > localtimestamp) AS next_show_time
+                FROM "Show"
+                WHERE {fk} IN (SELECT {fk} FROM "Shows")
+                GROUP BY {fk}
+            ) AS s
+            WHERE t.id = s.id
+        """)
+    op.drop_table('Shows')
+
+
+def downgrade():
+    op.create_table('Shows',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['Artist.id'], ),
+    sa.ForeignKeyConstraint(['venue_id'], ['Venue.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.drop_index('ix_venue_area', table_name='Venue')
+    op.drop_index('ix_show_start', table_name='Show')
+    op.drop_index('ix_show_artist_start', table_name='Show')
+    op.drop_index('ix_show_venue_start', table_name='Show')
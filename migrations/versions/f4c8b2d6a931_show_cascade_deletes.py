@@ -0,0 +1,31 @@
+"""ON DELETE CASCADE on the Show foreign keys
+
+Revision ID: f4c8b2d6a931
+Revises: d3f6a8c2b517
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c8b2d6a931'
+down_revision = 'd3f6a8c2b517'
+branch_labels = None
+depends_on = None
+
+
+def replace_foreign_keys(ondelete):
+    for column, table in (('venue_id', 'Venue'), ('artist_id', 'Artist')):
+        name = f'Show_{column}_fkey'
+        op.drop_constraint(name, 'Show', type_='foreignkey')
+        op.create_foreign_key(name, 'Show', table, [column], ['id'],
+                              ondelete=ondelete)
+
+
+def upgrade():
+    replace_foreign_keys('CASCADE')
+
+
+def downgrade():
+    replace_foreign_keys(None)
@@ -1,43 +1,87 @@
-from flask import Flask
-from flask_migrate import Migrate
+from datetime import datetime
+
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import raiseload
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+
+from pool import MonitoredQueuePool, init_statement_timeouts
 
 
 # Initialized without explicit app (Flask instance)
 db = SQLAlchemy()
 
+# Full-text search document of a Venue or Artist, weighted name > city > genres.
+# array_to_string() is only STABLE, so it is wrapped in an IMMUTABLE function
+# usable by the generated `search_vector` columns.
+event.listen(db.metadata, "before_create", DDL("""
+CREATE OR REPLACE FUNCTION fyyur_search_document(name text, city text, genres text[])
+RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(city, '')), 'B')
+        || setweight(to_tsvector('simple',
+               coalesce(array_to_string(genres, ' '), '')), 'C')
+$$
+"""))
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def raise_on_lazy_load(state):
+    """ With RAISE_ON_LAZY_LOAD, every ORM query, including the ones
+    loading relationships, gets `raiseload("*")`: a relationship it did not
+    load eagerly raises when accessed instead of issuing a query per row."""
+    if (state.is_select and not state.is_column_load
+            and current_app.config["RAISE_ON_LAZY_LOAD"]):
+        state.statement = state.statement.options(raiseload("*"))
 
-def create_app(app):
-    app.config.from_object("config")
-    db.app = app
+
+def init_db(app):
+    """ Bind `db` to a configured app. Migrations are set up by the CLI only,
+    see app.init_cli."""
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"].setdefault(
+        "poolclass", MonitoredQueuePool)
     db.init_app(app)
-    migrate = Migrate(app, db)
+    init_statement_timeouts(app, db.session)
     return db
 
 
 class Show(db.Model):
     __tablename__ = 'Show'
+    __table_args__ = (
+        # Upcoming/past shows of a venue or artist, and the /shows listing.
+        db.Index("ix_show_venue_start", "venue_id", "start_time"),
+        db.Index("ix_show_artist_start", "artist_id", "start_time"),
+        db.Index("ix_show_start", "start_time", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     start_time = db.Column(db.DateTime)
+    # Deleting a venue or artist deletes its shows, see deletes.py
     artist_id = db.Column(db.Integer, db.ForeignKey(
-        'Artist.id'), nullable=False)
+        'Artist.id', ondelete="CASCADE"), nullable=False)
     venue_id = db.Column(db.Integer, db.ForeignKey(
-        'Venue.id'), nullable=False)
-
-
-presentations = db.Table(
-    "Shows",
-    db.Column("id", db.Integer, primary_key=True, autoincrement=True),
-    db.Column("artist_id", db.Integer, db.ForeignKey(
-        "Artist.id"), nullable=False),
-    db.Column("venue_id", db.Integer, db.ForeignKey(
-        "Venue.id"), nullable=False),
-    db.Column("start_time", db.DateTime, nullable=False),
-)
+        'Venue.id', ondelete="CASCADE"), nullable=False)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now,
+        server_default=db.func.localtimestamp())
 
 
 class Venue(db.Model):
     __tablename__ = "Venue"
+    __table_args__ = (
+        db.Index("ix_venue_search", "search_vector", postgresql_using="gin"),
+        db.Index("ix_venue_genres", "genres", postgresql_using="gin"),
+        # Keyset order of the /venues listing
+        db.Index("ix_venue_area", "state", "city", "id"),
+        # Natural key of bulk imports, see importer.py
+        db.Index("ix_venue_natural_key", "name", "city", "state"),
+        # Name prefix matches of short search terms, see search.py
+        db.Index("ix_venue_name_prefix",
+                 db.text('(lower(name) COLLATE "C")'), "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String)
@@ -47,16 +91,39 @@ class Venue(db.Model):
     phone = db.Column(db.String(120))
     image_link = db.Column(db.String(500))
     facebook_link = db.Column(db.String(120))
-    genres = db.Column(db.ARRAY(db.String))
+    genres = db.Column(ARRAY(db.String))
     website = db.Column(db.String(120))
     seeking_talent = db.Column(db.Boolean)
     seeking_description = db.Column(db.String(500))
+    # Show counters maintained by stats.py
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0")
+    past_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0")
+    next_show_time = db.Column(db.DateTime)
+    # Bumped by every edit, see edits.py
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now,
+        server_default=db.func.localtimestamp())
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "fyyur_search_document(name, city, genres)")))
+    # Pages query shows directly (see queries.show_history), never this.
     shows = db.relationship(
-        "Show", backref="Venue", lazy="joined", cascade='all, delete')
+        "Show", backref="Venue", cascade='all, delete', passive_deletes=True)
 
 
 class Artist(db.Model):
     __tablename__ = "Artist"
+    __table_args__ = (
+        db.Index("ix_artist_search", "search_vector", postgresql_using="gin"),
+        db.Index("ix_artist_genres", "genres", postgresql_using="gin"),
+        # Natural key of bulk imports, see importer.py
+        db.Index("ix_artist_natural_key", "name", "city", "state"),
+        # Name prefix matches of short search terms, see search.py
+        db.Index("ix_artist_name_prefix",
+                 db.text('(lower(name) COLLATE "C")'), "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String)
@@ -66,8 +133,22 @@ class Artist(db.Model):
     image_link = db.Column(db.String(500))
     facebook_link = db.Column(db.String(120))
     website = db.Column(db.String(120))
-    genres = db.Column(db.ARRAY(db.String))
+    genres = db.Column(ARRAY(db.String))
     seeking_description = db.Column(db.String(500))
     seeking_venue = db.Column(db.Boolean)
+    # Show counters maintained by stats.py
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0")
+    past_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0")
+    next_show_time = db.Column(db.DateTime)
+    # Bumped by every edit, see edits.py
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now,
+        server_default=db.func.localtimestamp())
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "fyyur_search_document(name, city, genres)")))
+    # Pages query shows directly (see queries.show_history), never this.
     shows = db.relationship(
-        "Show", backref="Artist", lazy="joined", cascade='all, delete')
+        "Show", backref="Artist", cascade='all, delete', passive_deletes=True)
@@ -0,0 +1,144 @@
+""" Query plan regression check.
+
+`flask plans check` runs the hot queries of the read and delete paths
+against the configured database, captures the SQL they send, EXPLAINs each
+statement and fails if a plan sequentially scans Show, Venue or Artist.
+Run it against a large seeded database (see benchmarks/seed.py); on small
+tables PostgreSQL rightly prefers sequential scans:
+
+    SQLALCHEMY_DATABASE_URI=postgresql://localhost/fyyur_bench flask plans check
+
+Everything runs in one transaction that is rolled back, so the write
+queries (counter refresh, delete) change nothing.
+"""
+from contextlib import contextmanager
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, func
+
+from deletes import delete_entities
+from models import db, Venue, Artist, Show
+from queries import (
+    counterpart_ids,
+    entity_version,
+    show_counts,
+    show_history,
+    show_listing,
+    venue_areas,
+)
+from search import search
+from stats import refresh
+
+# Tables too large to scan on a request.
+LARGE_TABLES = frozenset(["Show", "Venue", "Artist"])
+
+
+def busiest(model):
+    return db.session.query(model.id).order_by(
+        (model.upcoming_shows_count + model.past_shows_count).desc(),
+        model.id).limit(1).scalar()
+
+
+def name_of(model, entity_id):
+    # A selective search term; broad ones rightly scan.
+    return db.session.query(model.name).filter(model.id == entity_id).scalar()
+
+
+def hot_queries(venue_id, artist_id):
+    """ (name, callable) for every query on a hot path."""
+    queries = [
+        ("venue_areas", lambda: venue_areas()),
+        ("show_listing", lambda: show_listing()),
+        ("show_listing_version", lambda: show_listing(version=True)),
+        ("search_venues", lambda: search(Venue, name_of(Venue, venue_id))),
+        ("search_artists", lambda: search(Artist, name_of(Artist, artist_id))),
+    ]
+    for model, fk, counterpart, counterpart_fk, entity_id in (
+            (Venue, Show.venue_id, Artist, Show.artist_id, venue_id),
+            (Artist, Show.artist_id, Venue, Show.venue_id, artist_id)):
+        name = model.__name__.lower()
+        queries += [
+            (f"{name}_version", lambda m=model, i=entity_id: entity_version(m, i)),
+            (f"{name}_show_counts", lambda f=fk, i=entity_id: show_counts(f, i)),
+            (f"{name}_upcoming_shows", lambda f=fk, i=entity_id, c=counterpart:
+                show_history(f, i, c, upcoming=True)),
+            (f"{name}_past_shows", lambda f=fk, i=entity_id, c=counterpart:
+                show_history(f, i, c, upcoming=False)),
+            (f"{name}_counterparts", lambda f=fk, i=entity_id, c=counterpart_fk:
+                counterpart_ids(f, i, c)),
+            (f"{name}_refresh_counters", lambda m=model, f=fk, i=entity_id:
+                refresh(m, f, m.id == i)),
+        ]
+    queries += [
+        ("venue_delete", lambda: delete_entities(Venue, [venue_id])),
+        ("artist_delete", lambda: delete_entities(Artist, [artist_id])),
+    ]
+    return queries
+
+
+@contextmanager
+def captured_statements(connection):
+    """ Collect the (statement, parameters) sent on `connection`."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+
+def seq_scans(plan):
+    """ Relations sequentially scanned anywhere in an EXPLAIN JSON plan."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found += seq_scans(child)
+    return found
+
+
+def check_plans():
+    """ Yield (query name, statement, sequentially scanned large tables)."""
+    connection = db.session.connection()
+    venue_id, artist_id = busiest(Venue), busiest(Artist)
+    try:
+        for name, run in hot_queries(venue_id, artist_id):
+            with captured_statements(connection) as statements:
+                run()
+            for statement, parameters in statements:
+                plan = connection.exec_driver_sql(
+                    "EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+                scanned = sorted(set(seq_scans(plan[0]["Plan"])) & LARGE_TABLES)
+                yield name, statement, scanned
+    finally:
+        db.session.rollback()
+
+
+plans_cli = AppGroup("plans", help="Check the query plans of the hot paths.")
+
+
+@plans_cli.command("check")
+@click.option("--min-rows", default=10000, show_default=True,
+              help="Refuse to run when Show has fewer rows.")
+def check_command(min_rows):
+    """EXPLAIN every hot query and fail on sequential scans."""
+    shows = db.session.query(func.count(Show.id)).scalar()
+    if shows < min_rows:
+        raise click.ClickException(
+            f"Show has {shows} rows; seed a larger database first.")
+    failures = 0
+    for name, statement, scanned in check_plans():
+        if scanned:
+            failures += 1
+            click.echo(f"FAIL {name}: seq scan on {', '.join(scanned)}\n"
+                       f"     {' '.join(statement.split())[:300]}", err=True)
+        else:
+            click.echo(f"ok   {name}")
+    if failures:
+        raise click.ClickException(f"{failures} statements scan large tables.")
@@ -0,0 +1,116 @@
+""" Connection pool monitoring and per-request statement timeouts.
+
+The engine uses `MonitoredQueuePool`, which records how long each checkout
+waited for a connection and how long it was held; `/pool/status` (served
+with INSTRUMENTATION or in debug mode) reports those timings next to the
+pool's current size. Pool sizing comes from
+SQLALCHEMY_ENGINE_OPTIONS in config.py.
+"""
+import threading
+import time
+from collections import deque
+
+from flask import has_request_context, request
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# Number of recent checkouts the percentiles are computed over.
+WINDOW = 1000
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waits = deque(maxlen=WINDOW)
+        self.held = deque(maxlen=WINDOW)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.waits.append(seconds)
+
+    def record_held(self, seconds):
+        with self._lock:
+            self.held.append(seconds)
+
+    def snapshot(self, pool):
+        with self._lock:
+            waits, held = list(self.waits), list(self.held)
+            checkouts, timeouts = self.checkouts, self.timeouts
+
+        def timings(values):
+            return {
+                name: None if value is None else round(value * 1000, 3)
+                for name, value in (
+                    ("p50_ms", percentile(values, 0.5)),
+                    ("p95_ms", percentile(values, 0.95)),
+                    ("max_ms", max(values, default=None)),
+                )
+            }
+
+        return {
+            "pool": type(pool).__name__,
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait": timings(waits),
+            "held": timings(held),
+        }
+
+
+pool_stats = PoolStats()
+
+
+class MonitoredQueuePool(QueuePool):
+    """ QueuePool timing how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+@event.listens_for(MonitoredQueuePool, "checkout")
+def on_checkout(dbapi_connection, record, proxy):
+    record.info["checked_out_at"] = time.perf_counter()
+
+
+@event.listens_for(MonitoredQueuePool, "checkin")
+def on_checkin(dbapi_connection, record):
+    checked_out_at = record.info.pop("checked_out_at", None)
+    if checked_out_at is not None:
+        pool_stats.record_held(time.perf_counter() - checked_out_at)
+
+
+def init_statement_timeouts(app, session):
+    """ Set the statement timeout of every transaction `session` (a session,
+    scoped session or Session class) begins during a request:
+    STATEMENT_TIMEOUTS for its endpoint, else DB_STATEMENT_TIMEOUT.
+    CLI commands and scripts run without a timeout."""
+    default = app.config["DB_STATEMENT_TIMEOUT"]
+    timeouts = app.config["STATEMENT_TIMEOUTS"]
+
+    @event.listens_for(session, "after_begin")
+    def set_statement_timeout(session, transaction, connection):
+        if has_request_context():
+            timeout = timeouts.get(request.endpoint, default)
+            connection.exec_driver_sql(
+                f"SET LOCAL statement_timeout = {int(timeout)}")
@@ -0,0 +1,303 @@
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
+from itertools import groupby
+
+from flask import current_app
+from sqlalchemy import String, cast, func, tuple_, update
+
+from enums import Genre
+from rules import GENRES, STATES
+from models import db, Venue, Artist, Show
+
+
+Page = namedtuple("Page", ["items", "next_cursor", "prev_cursor"])
+# Validator of a page: `tag` changes whenever the rows on it change.
+Version = namedtuple("Version", ["tag", "last_modified"])
+
+
+def encode_cursor(values):
+    """ Opaque, URL-safe cursor for the sort key of a row."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v
+                      for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    """ Decode a cursor back into typed values for the given sort columns.
+    Malformed cursors raise ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    try:
+        return tuple(cursor_value(v, c) for v, c in zip(values, columns))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def cursor_value(value, column):
+    """ A decoded cursor value as the Python type of its sort column. Values
+    of another type raise ValueError."""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if value is None:
+        return value
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise ValueError(f"Expected a datetime, got {value!r}")
+        return datetime.fromisoformat(value)
+    # JSON has no int/float distinction, and bool is an int in Python.
+    if python_type is float and type(value) is int:
+        return float(value)
+    if not isinstance(value, python_type) or (
+            isinstance(value, bool) and python_type is not bool):
+        raise ValueError(f"Expected {python_type.__name__}, got {value!r}")
+    return value
+
+
+def page_size(per_page=None):
+    """ Requested page size, capped at MAX_PAGE_SIZE."""
+    config = current_app.config
+    per_page = per_page or config["PAGE_SIZE"]
+    return max(1, min(per_page, config["MAX_PAGE_SIZE"]))
+
+
+def keyset_window(query, columns, after=None, before=None, per_page=None,
+                  descending=False):
+    """ Restrict `query`, ordered by `columns` (a unique sort key), to the rows
+    of one page plus one extra row telling whether another page exists.
+
+    `after` selects the page following a cursor, `before` the page preceding
+    it (in reverse order).
+    """
+    per_page = page_size(per_page)
+    key = tuple_(*columns)
+    # Paging back from `before` scans the sort key in the opposite direction.
+    scan_desc = bool(before) != descending
+    cursor_value = before or after
+    if cursor_value:
+        cursor_value = decode_cursor(cursor_value, columns)
+        query = query.filter(key < cursor_value if scan_desc else key > cursor_value)
+    query = query.order_by(*[c.desc() if scan_desc else c for c in columns])
+    return query.limit(per_page + 1)
+
+
+def keyset_page(query, columns, after=None, before=None, per_page=None,
+                descending=False):
+    """ Fetch one page of `query` ordered by `columns`, see keyset_window."""
+    per_page = page_size(per_page)
+    rows = keyset_window(query, columns, after=after, before=before,
+                         per_page=per_page, descending=descending).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before:
+        rows.reverse()
+    if not rows:
+        return Page(rows, None, None)
+
+    def cursor(row):
+        return encode_cursor([getattr(row, c.key) for c in columns])
+
+    has_next = has_more if not before else True
+    has_prev = bool(after) if not before else has_more
+    return Page(rows,
+                cursor(rows[-1]) if has_next else None,
+                cursor(rows[0]) if has_prev else None)
+
+
+def keyset_version(query, columns, after=None, before=None, per_page=None,
+                   descending=False):
+    """ Version of the page keyset_page would return, from one aggregate row
+    over the same window. `query` must select `id` and `updated_at`.
+
+    It has no Last-Modified: the newest updated_at of a window can go back
+    in time when rows are deleted or leave it, which would make
+    If-Modified-Since answer 304 for a changed page. The tag covers that."""
+    window = keyset_window(query, columns, after=after, before=before,
+                           per_page=per_page, descending=descending).subquery()
+    count, last_modified, ids = query.session.query(
+        func.count(),
+        func.max(window.c.updated_at),
+        func.string_agg(cast(window.c.id, String), ","),
+    ).one()
+    return Version(f"{count}:{ids}:{last_modified}", None)
+
+
+def browse_args(args):
+    """ The genre and state filters of a listing from its query string, e.g.
+    ?genre=Jazz&genre=Blues&match=any&state=CA"""
+    return {
+        "genres": args.getlist("genre"),
+        "states": args.getlist("state"),
+        "match": args.get("match", "all"),
+    }
+
+
+def browse_filters(model, genres=(), states=(), match="all"):
+    """ Criteria keeping the Venues or Artists that have all `genres`
+    (@> containment) or, with match="any", at least one of them (&& overlap),
+    both served by the GIN index on `genres`, in one of `states`. Unknown
+    genres, states or match modes raise ValueError."""
+    if not GENRES.issuperset(genres) or not STATES.issuperset(states):
+        raise ValueError("Unknown genre or state")
+    if match not in ("all", "any"):
+        raise ValueError(f"Invalid match: {match}")
+    criteria = []
+    if genres:
+        criteria.append(model.genres.overlap(genres) if match == "any"
+                        else model.genres.contains(genres))
+    if states:
+        criteria.append(model.state.in_(states))
+    return criteria
+
+
+def genre_facets(model, **filters):
+    """ Number of Venues or Artists matching `filters` (see browse_filters)
+    for every Genre, in one aggregate query."""
+    genres = (db.session.query(func.unnest(model.genres).label("genre"))
+              .filter(*browse_filters(model, **filters))
+              .subquery())
+    counts = dict(db.session.query(genres.c.genre, func.count())
+                  .group_by(genres.c.genre))
+    return [{"genre": g.name, "label": g.value, "count": counts.get(g.name, 0)}
+            for g in Genre]
+
+
+def venue_areas(after=None, before=None, per_page=None, version=False,
+                session=None, **filters):
+    """ Group one page of venues by city/state with their upcoming show counts.
+
+    One query returns one row per venue:
+    (city, state, venue id, venue name, upcoming show count)
+    ordered by area, so the areas are built in one pass over the rows.
+    Returns the areas and the page cursors, or the page Version. `filters`
+    are passed to browse_filters.
+    """
+    query = (session or db.session).query(
+        Venue.city,
+        Venue.state,
+        Venue.id,
+        Venue.name,
+        Venue.upcoming_shows_count.label("upcoming_shows"),
+        Venue.updated_at,
+    ).filter(*browse_filters(Venue, **filters))
+    if version:
+        return keyset_version(query, [Venue.state, Venue.city, Venue.id],
+                              after=after, before=before, per_page=per_page)
+    page = keyset_page(query, [Venue.state, Venue.city, Venue.id],
+                       after=after, before=before, per_page=per_page)
+
+    areas = [{
+        "city": city,
+        "state": state,
+        "venues": [{
+            "id": row.id,
+            "name": row.name,
+            "upcoming_shows": row.upcoming_shows,
+        } for row in venues]
+    } for (state, city), venues in groupby(page.items, key=lambda r: (r.state, r.city))]
+    return page._replace(items=areas)
+
+
+def artist_listing(after=None, before=None, per_page=None, version=False,
+                   session=None, **filters):
+    """ One page of artists, projected to the columns the listing renders.
+    `filters` are passed to browse_filters."""
+    query = (session or db.session).query(
+        Artist.id, Artist.name, Artist.updated_at).filter(
+        *browse_filters(Artist, **filters))
+    paging = keyset_version if version else keyset_page
+    return paging(query, [Artist.id],
+                       after=after, before=before, per_page=per_page)
+
+
+def show_listing(after=None, before=None, per_page=None, version=False,
+                 session=None):
+    """ One page of shows in start time order, joined to the venue and
+    artist columns the listing renders."""
+    query = (session or db.session).query(
+        Show.id,
+        Show.start_time,
+        Show.venue_id,
+        Venue.name.label("venue_name"),
+        Show.artist_id,
+        Artist.name.label("artist_name"),
+        Artist.image_link.label("artist_image_link"),
+        func.greatest(
+            Show.updated_at, Venue.updated_at, Artist.updated_at
+        ).label("updated_at"),
+    ).join(Venue, Show.venue_id == Venue.id).join(Artist, Show.artist_id == Artist.id)
+    paging = keyset_version if version else keyset_page
+    return paging(query, [Show.start_time, Show.id],
+                       after=after, before=before, per_page=per_page)
+
+
+def show_counts(fk, entity_id, now=None, session=None):
+    """ (upcoming, past) show counts of one venue or artist in one aggregate
+    query. `fk` is Show.venue_id or Show.artist_id."""
+    now = now or datetime.now()
+    return (session or db.session).query(
+        func.count(Show.id).filter(Show.start_time > now),
+        func.count(Show.id).filter(Show.start_time <= now),
+    ).filter(fk == entity_id).one()
+
+
+def entity_version(model, entity_id, session=None):
+    """ Version of a venue or artist detail page from a single-row lookup,
+    or None if it does not exist. Show creation and counterpart edits bump
+    updated_at too, see app.py."""
+    updated_at = (session or db.session).query(model.updated_at).filter(
+        model.id == entity_id).scalar()
+    if updated_at is None:
+        return None
+    return Version(updated_at.isoformat(), updated_at)
+
+
+def touch(model, ids):
+    """ Bump updated_at of the given venues or artists, e.g. when a page of
+    theirs shows a counterpart that changed."""
+    if ids:
+        db.session.execute(
+            update(model).where(model.id.in_(ids)).values(updated_at=datetime.now()),
+            execution_options={"synchronize_session": False})
+
+
+def counterpart_ids(fk, entity_id, counterpart_fk):
+    """ Ids of the artists a venue has shows with, or of the venues an artist
+    has shows at, e.g. counterpart_ids(Show.venue_id, 1, Show.artist_id)."""
+    return {id for id, in db.session.query(counterpart_fk).filter(
+        fk == entity_id).distinct()}
+
+
+def show_history(fk, entity_id, counterpart, upcoming, after=None,
+                 before=None, per_page=None, now=None, session=None):
+    """ One page of the upcoming (soonest first) or past (latest first) shows
+    of a venue or artist, joined to the counterpart artist or venue.
+
+    Rows carry start_time and `<counterpart>_id`, `<counterpart>_name` and
+    `<counterpart>_image_link`, e.g. artist_name on a venue's history.
+    """
+    now = now or datetime.now()
+    prefix = counterpart.__name__.lower()
+    query = (session or db.session).query(
+        Show.id,
+        Show.start_time,
+        counterpart.id.label(f"{prefix}_id"),
+        counterpart.name.label(f"{prefix}_name"),
+        counterpart.image_link.label(f"{prefix}_image_link"),
+    ).join(
+        counterpart, getattr(Show, f"{prefix}_id") == counterpart.id
+    ).filter(
+        fk == entity_id,
+        Show.start_time > now if upcoming else Show.start_time <= now,
+    )
+    return keyset_page(query, [Show.start_time, Show.id],
+                       after=after, before=before, per_page=per_page,
+                       descending=not upcoming)
@@ -0,0 +1,229 @@
+""" Validation rules of the Venue, Artist and Show forms.
+
+Plain-dict validation shared by the WTForms forms (forms.py), the edit
+paths (edits.py, api.py) and the importer, without importing WTForms.
+"""
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+import re
+
+from enums import Genre, State
+from models import Venue, Artist
+
+PHONE_PATTERN = re.compile(
+    r'^\(?([0-9]{3})\)?[-. ]?([0-9]{3})[-. ]?([0-9]{4})$')
+GENRES = frozenset(name for name, _ in Genre.choices())
+STATES = frozenset(name for name, _ in State.choices())
+
+# Ids are PostgreSQL integers.
+MAX_ID = 2 ** 31 - 1
+
+FALSE_VALUES = (None, False, 'false', '')
+# Booleans as CSV files spell them.
+BOOLEAN_STRINGS = frozenset(['true', 'false', ''])
+# Form field -> column, where the names differ.
+COLUMN_NAMES = {'website_link': 'website'}
+
+
+def is_valid_phone(number):
+    """ Validate phone numbers like:
+    1234567890 - no space
+    123.456.7890 - dot separator
+    123-456-7890 - dash separator
+    123 456 7890 - space separator
+
+    Patterns:
+    000 = [0-9]{3}
+    0000 = [0-9]{4}
+    -.  = ?[-. ]
+
+    Note: (? = optional) - Learn more: https://regex101.com/
+    """
+    return PHONE_PATTERN.match(number)
+
+
+@lru_cache(maxsize=None)
+def url_validator():
+    # Same check as the URL validator of the forms; WTForms is imported
+    # only once a URL is validated.
+    from wtforms.validators import URL
+    return URL()
+
+
+def is_valid_url(value):
+    url = url_validator()
+    match = url.regex.match(value or '')
+    return bool(match) and url.validate_hostname(match.group('host'))
+
+
+class Validator:
+    """ The rules of a form, built once and applied to plain dicts keyed by
+    the form's field names. Used by the forms in forms.py and, without
+    building WTForms objects, by bulk loaders (`validate_many`)."""
+
+    def __init__(self, fields, required=(), choices=None, multiple=(),
+                 patterns=None, urls=(), booleans=(), datetimes=(), integers=(),
+                 lengths=None):
+        self.fields = tuple(fields)
+        self.required = tuple(required)
+        # field -> (frozenset of allowed values, message)
+        self.choices = choices or {}
+        self.multiple = frozenset(multiple)
+        # field -> (compiled pattern, message)
+        self.patterns = patterns or {}
+        self.urls = tuple(urls)
+        self.booleans = frozenset(booleans)
+        self.datetimes = tuple(datetimes)
+        self.integers = tuple(integers)
+        # field -> maximum length
+        self.lengths = lengths or {}
+
+    def type_errors(self, row):
+        """ {field: [message]} for the values of `row` of a type the field
+        cannot hold, e.g. from a JSON body. None is always allowed."""
+        errors = {}
+        for field in self.fields:
+            value = row.get(field)
+            if value is None:
+                continue
+            if field in self.booleans:
+                valid = isinstance(value, bool) or (
+                    isinstance(value, str) and value.lower() in BOOLEAN_STRINGS)
+                message = 'Not a valid boolean.'
+            elif field in self.multiple:
+                valid = isinstance(value, str) or (
+                    isinstance(value, list)
+                    and all(isinstance(item, str) for item in value))
+                message = 'Not a list of strings.'
+            elif field in self.datetimes:
+                valid = isinstance(value, (str, datetime))
+                message = 'Not a valid datetime value.'
+            elif field in self.integers:
+                valid = isinstance(value, (str, int)) and not isinstance(value, bool)
+                message = 'Not a valid id.'
+            else:
+                valid = isinstance(value, str)
+                message = 'Not a string.'
+            if not valid:
+                errors[field] = [message]
+        return errors
+
+    def clean(self, row):
+        """ The row's values as the form would hold them."""
+        values = {}
+        for field in self.fields:
+            value = row.get(field)
+            if field in self.booleans:
+                if isinstance(value, str):
+                    value = value.lower()
+                value = value not in FALSE_VALUES
+            elif field in self.multiple:
+                if isinstance(value, str):
+                    value = [item.strip() for item in value.split(',') if item.strip()]
+                value = list(value or [])
+            elif value is None:
+                value = ''
+            values[field] = value
+        return values
+
+    def validate(self, row):
+        """ Return (values, errors) where errors maps each field to every
+        message it failed, and is empty for a valid row. Values of the wrong
+        type are only reported as such."""
+        wrong_types = self.type_errors(row)
+        values = self.clean({field: value for field, value in row.items()
+                             if field not in wrong_types})
+        errors = defaultdict(list)
+        for field in self.required:
+            if not values[field]:
+                errors[field].append('This field is required.')
+        for field, (allowed, message) in self.choices.items():
+            value = values[field]
+            if field in self.multiple:
+                if not allowed.issuperset(value):
+                    errors[field].append(message)
+            elif value and value not in allowed:
+                errors[field].append(message)
+        for field, (pattern, message) in self.patterns.items():
+            if not pattern.match(values[field]):
+                errors[field].append(message)
+        for field in self.urls:
+            if not is_valid_url(values[field]):
+                errors[field].append('Invalid URL.')
+        for field in self.datetimes:
+            value = values[field]
+            if isinstance(value, str) and value:
+                # '2019-05-21 21:30:00', or ISO 8601 as the API exports it.
+                try:
+                    values[field] = datetime.fromisoformat(value)
+                except ValueError:
+                    errors[field].append('Not a valid datetime value.')
+                    continue
+            if isinstance(values[field], datetime) and values[field].tzinfo:
+                errors[field].append('Expected a local time, without a UTC offset.')
+        for field in self.integers:
+            try:
+                values[field] = int(values[field])
+            except (TypeError, ValueError):
+                errors[field].append('Not a valid id.')
+                continue
+            if not 0 < values[field] <= MAX_ID:
+                errors[field].append('Not a valid id.')
+        for field, length in self.lengths.items():
+            if len(values[field]) > length:
+                errors[field].append(
+                    f'Field cannot be longer than {length} characters.')
+        errors.update(wrong_types)
+        return values, dict(errors)
+
+    def validate_many(self, rows):
+        """ Yield (values, errors) for each row."""
+        validate = self.validate
+        for row in rows:
+            yield validate(row)
+
+
+def max_lengths(model, fields):
+    """ field -> n, for the `fields` stored in String(n) columns of `model`."""
+    lengths = {}
+    for field in fields:
+        column = model.__table__.c[COLUMN_NAMES.get(field, field)]
+        length = getattr(column.type, 'length', None)
+        if length is not None:
+            lengths[field] = length
+    return lengths
+
+
+ENTITY_FIELDS = ('name', 'city', 'state', 'phone', 'image_link', 'genres',
+                 'facebook_link', 'website_link', 'seeking_description')
+ENTITY_RULES = dict(
+    choices={'state': (STATES, 'Invalid state.'),
+             'genres': (GENRES, 'Invalid genres.')},
+    multiple=('genres',),
+    patterns={'phone': (PHONE_PATTERN,
+                        'Invalid phone format (should be xxx-xxx-xxxx).')},
+    urls=('facebook_link',),
+)
+
+VENUE_FIELDS = ENTITY_FIELDS + ('address', 'seeking_talent')
+VENUE_RULES = Validator(
+    VENUE_FIELDS,
+    required=('name', 'city', 'state', 'address', 'genres'),
+    booleans=('seeking_talent',),
+    lengths=max_lengths(Venue, VENUE_FIELDS),
+    **ENTITY_RULES)
+
+ARTIST_FIELDS = ENTITY_FIELDS + ('seeking_venue',)
+ARTIST_RULES = Validator(
+    ARTIST_FIELDS,
+    required=('name', 'city', 'state', 'genres'),
+    booleans=('seeking_venue',),
+    lengths=max_lengths(Artist, ARTIST_FIELDS),
+    **ENTITY_RULES)
+
+SHOW_RULES = Validator(
+    ('artist_id', 'venue_id', 'start_time'),
+    required=('start_time',),
+    datetimes=('start_time',),
+    integers=('artist_id', 'venue_id'))
@@ -0,0 +1,70 @@
+import re
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from models import db
+
+# Search terms are reduced to word tokens before building a tsquery, so user
+# input never reaches the tsquery parser verbatim.
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def to_prefix_query(term):
+    """ Turn free text into a prefix tsquery: "new ro" -> "new:* & ro:*".
+    Returns None when the term has no searchable tokens."""
+    tokens = TOKEN.findall(term.lower())
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def name_prefix_pattern(term):
+    """ LIKE pattern of the lower-cased names starting with `term`."""
+    escaped = re.sub(r"([\\%_])", r"\\\1", term.strip().lower())
+    return escaped + "%"
+
+
+def search(model, term, limit=None, session=None):
+    """ Relevance-ranked search over name, city and genres of `model`.
+
+    Matches come from the GIN-indexed `search_vector` column. At most
+    SEARCH_RANK_WINDOW matches are ranked, so broad terms stay cheap, and at
+    most SEARCH_LIMIT rows are returned. Terms shorter than
+    SEARCH_PREFIX_LENGTH, which would match a large part of the table, only
+    match names starting with them, in name order, from the lower(name)
+    index. Rows have id, name and num_upcoming_shows (read from the
+    counters maintained by stats.py).
+    """
+    config = current_app.config
+    limit = limit or config["SEARCH_LIMIT"]
+
+    columns = (
+        model.id,
+        model.name,
+        model.upcoming_shows_count.label("num_upcoming_shows"),
+    )
+    tsquery = to_prefix_query(term)
+    if tsquery and len(term.strip()) < config["SEARCH_PREFIX_LENGTH"]:
+        # Byte order, as in the index, see migration 5e9a1c7d3b20.
+        name = func.lower(model.name).collate("C")
+        hits = select(*columns).where(
+            name.like(name_prefix_pattern(term), escape="\\")
+        ).order_by(name, model.id)
+    elif tsquery:
+        tsquery = func.to_tsquery("simple", tsquery)
+        candidates = select(
+            *columns,
+            model.search_vector,
+        ).where(
+            model.search_vector.op("@@")(tsquery)
+        ).limit(config["SEARCH_RANK_WINDOW"]).subquery()
+        rank = func.ts_rank(candidates.c.search_vector, tsquery)
+        hits = select(
+            candidates.c.id,
+            candidates.c.name,
+            candidates.c.num_upcoming_shows,
+        ).order_by(rank.desc(), candidates.c.name, candidates.c.id)
+    else:
+        hits = select(*columns).order_by(model.id)
+    return (session or db.session).execute(hits.limit(limit)).all()
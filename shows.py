@@ -0,0 +1,113 @@
+""" Show pages: listing, create, and the availability of venues and artists."""
+from datetime import datetime, timedelta
+
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    render_template,
+    request,
+)
+
+from availability import check_booking, free_slots
+from cache import page_cache
+from conditional import conditional
+from dto import ListedShow, rows_to
+from models import db, Venue, Show
+from queries import show_listing
+from stats import record_show
+from views import flash_errors, paginate
+
+show_pages = Blueprint("shows", __name__)
+
+
+@show_pages.route("/shows")
+@conditional(lambda: paginate(show_listing, version=True))
+@page_cache.cached("shows")
+def shows():
+    # displays list of shows at /shows
+    page = paginate(show_listing)
+    return render_shows(page)
+
+
+def render_shows(page):
+    return render_template("pages/shows.html",
+                           shows=rows_to(ListedShow, page.items), page=page)
+
+
+@show_pages.route("/shows/create", methods=["GET"])
+def create_shows():
+    # renders form. do not touch.
+    # WTForms is imported by the form pages only.
+    from forms import ShowForm
+    form = ShowForm()
+    return render_template("forms/new_show.html", form=form)
+
+
+@show_pages.route("/shows/create", methods=["POST"])
+def create_show_submission():
+    from forms import ShowForm
+    # Set the FlaskForm
+    form = ShowForm(request.form, meta={'csrf': False})
+    # Validate all fields
+    if form.validate():
+        errors = check_booking(int(form.venue_id.data), int(form.artist_id.data),
+                               form.start_time.data)
+        if errors:
+            db.session.rollback()
+            flash('Show could not be listed: ' + ' '.join(errors))
+            return render_template('forms/new_show.html', form=form)
+        try:
+            show = Show(
+                artist_id=form.artist_id.data,
+                venue_id=form.venue_id.data,
+                start_time=form.start_time.data,
+            )
+            db.session.add(show)
+            db.session.flush()
+            record_show(show)
+            db.session.commit()
+            page_cache.invalidate("shows", "venues",
+                                  f"venue:{form.venue_id.data}",
+                                  f"artist:{form.artist_id.data}")
+            flash(f'Show was successfully listed!')
+        except ValueError as e:
+            print(e)
+            db.session.rollback()
+            flash("An error occurred. Show could not be listed.")
+        finally:
+            db.session.close()
+        return render_template("pages/home.html")
+    else:
+        flash_errors(form)
+        return render_template('forms/new_show.html', form=form)
+
+
+@show_pages.route("/availability")
+def availability():
+    # free periods of a venue (and artist) in a window, e.g.
+    # /availability?venue_id=1&artist_id=2&from=2026-11-01&to=2026-11-08
+    try:
+        venue_id = int(request.args["venue_id"])
+        artist_id = request.args.get("artist_id", type=int)
+        start = datetime.fromisoformat(request.args["from"])
+        end = datetime.fromisoformat(request.args["to"])
+    except (KeyError, ValueError):
+        abort(400)
+    # Show times are local, without a UTC offset.
+    if start.tzinfo is not None or end.tzinfo is not None:
+        abort(400)
+    config = current_app.config
+    if not start < end <= start + timedelta(days=config["AVAILABILITY_MAX_DAYS"]):
+        abort(400)
+    if db.session.query(Venue.id).filter(Venue.id == venue_id).scalar() is None:
+        abort(404)
+    slots = free_slots(venue_id, start, end, artist_id=artist_id)
+    return jsonify({
+        "venue_id": venue_id,
+        "artist_id": artist_id,
+        "show_duration": config["SHOW_DURATION"],
+        "free": [{"from": a.isoformat(), "to": b.isoformat()} for a, b in slots],
+    })
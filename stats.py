@@ -0,0 +1,113 @@
+""" Denormalized show counters on Venue and Artist.
+
+Each Venue and Artist keeps `upcoming_shows_count`, `past_shows_count` and
+`next_show_time` so listing and search pages read them without touching
+Show. The counters are updated incrementally when shows are created or
+deleted, and `flask stats roll-forward` (run periodically, e.g. from cron)
+moves shows that have started from upcoming to past.
+"""
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import case, func, select, update
+
+from models import db, Venue, Artist, Show
+
+# (model, foreign key on Show) for every entity carrying counters.
+COUNTED = ((Venue, Show.venue_id), (Artist, Show.artist_id))
+
+
+def record_show(show, now=None):
+    """ Count a newly added show against its venue and artist. Runs in the
+    caller's transaction."""
+    now = now or datetime.now()
+    for model, fk in COUNTED:
+        entity_id = getattr(show, fk.key)
+        if show.start_time > now:
+            values = {
+                "upcoming_shows_count": model.upcoming_shows_count + 1,
+                "next_show_time": func.least(model.next_show_time, show.start_time),
+            }
+        else:
+            values = {"past_shows_count": model.past_shows_count + 1}
+        db.session.execute(
+            update(model).where(model.id == entity_id).values(**values),
+            execution_options={"synchronize_session": False})
+
+
+def discount(model, fk, criterion, now=None):
+    """ Take the shows matching `criterion` off the counters of `model`, in
+    one grouped UPDATE, before they are deleted. Only entities whose next
+    show is among them look up their next remaining show. Runs in the
+    caller's transaction; returns (id, shows taken off) per updated row."""
+    now = now or datetime.now()
+    shows = select(
+        fk.label("id"),
+        func.count(Show.id).filter(Show.start_time > now).label("upcoming"),
+        func.count(Show.id).filter(Show.start_time <= now).label("past"),
+        func.min(Show.start_time).filter(Show.start_time > now).label("next"),
+    ).where(criterion).group_by(fk).subquery()
+    remaining = select(func.min(Show.start_time)).where(
+        fk == model.id, Show.start_time > now, ~criterion,
+    ).correlate(model).scalar_subquery()
+    statement = update(model).where(model.id == shows.c.id).values(
+        upcoming_shows_count=model.upcoming_shows_count - shows.c.upcoming,
+        past_shows_count=model.past_shows_count - shows.c.past,
+        next_show_time=case(
+            (model.next_show_time == shows.c.next, remaining),
+            else_=model.next_show_time),
+    ).returning(model.id, shows.c.upcoming + shows.c.past)
+    return db.session.execute(
+        statement, execution_options={"synchronize_session": False}).all()
+
+
+def refresh(model, fk, criterion=None, now=None):
+    """ Recompute the counters of `model` from Show, for the rows matching
+    `criterion` or for every row. Returns the number of rows updated."""
+    now = now or datetime.now()
+
+    def shows(*columns):
+        return select(*columns).where(fk == model.id).correlate(model)
+
+    statement = update(model).values(
+        upcoming_shows_count=shows(func.count(Show.id)).where(
+            Show.start_time > now).scalar_subquery(),
+        past_shows_count=shows(func.count(Show.id)).where(
+            Show.start_time <= now).scalar_subquery(),
+        next_show_time=shows(func.min(Show.start_time)).where(
+            Show.start_time > now).scalar_subquery(),
+    )
+    if criterion is not None:
+        statement = statement.where(criterion)
+    return db.session.execute(
+        statement, execution_options={"synchronize_session": False}).rowcount
+
+
+def roll_forward(now=None):
+    """ Refresh only the entities whose next show has started since the last
+    run. Returns the number of rows updated."""
+    now = now or datetime.now()
+    updated = 0
+    for model, fk in COUNTED:
+        updated += refresh(model, fk, model.next_show_time <= now, now=now)
+    return updated
+
+
+stats_cli = AppGroup("stats", help="Maintain the denormalized show counters.")
+
+
+@stats_cli.command("roll-forward")
+def roll_forward_command():
+    """Move shows that have started from upcoming to past."""
+    updated = roll_forward()
+    db.session.commit()
+    click.echo(f"Rolled forward {updated} rows.")
+
+
+@stats_cli.command("rebuild")
+def rebuild_command():
+    """Recompute every counter from the Show table."""
+    updated = sum(refresh(model, fk) for model, fk in COUNTED)
+    db.session.commit()
+    click.echo(f"Rebuilt {updated} rows.")
@@ -0,0 +1,34 @@
+""" Test fixtures.
+
+Unit tests run anywhere. Tests using the `app` or `client` fixtures need a
+migrated database and are skipped unless TEST_DATABASE_URI is set:
+
+    TEST_DATABASE_URI=postgresql://localhost/fyyur_test python -m pytest
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app():
+    uri = os.environ.get("TEST_DATABASE_URI")
+    if not uri:
+        pytest.skip("TEST_DATABASE_URI is not set")
+    import config
+    from app import create_app
+    settings = {name: getattr(config, name) for name in dir(config)
+                if name.isupper()}
+    settings.update(SQLALCHEMY_DATABASE_URI=uri, SECRET_KEY="test",
+                    CACHE_TYPE="null", TEMPLATE_WARMUP=False, TESTING=True,
+                    RAISE_ON_LAZY_LOAD=True)
+    return create_app(SimpleNamespace(**settings))
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,34 @@
+import pytest
+
+
+@pytest.mark.parametrize("body, field", [
+    ({"phone": 5551234567}, "phone"),
+    ({"name": {"first": "The"}}, "name"),
+    ({"genres": [1, 2]}, "genres"),
+    ({"seeking_talent": "maybe"}, "seeking_talent"),
+    ({"city": "x" * 121}, "city"),
+])
+def test_patch_rejects_invalid_fields(client, body, field):
+    response = client.patch("/api/v1/venues/1", json=dict(body, version=1))
+    assert response.status_code == 400
+    assert list(response.get_json()["fields"]) == [field]
+
+
+def test_patch_rejects_unknown_fields(client):
+    response = client.patch("/api/v1/artists/1",
+                            json={"version": 1, "seeking_talent": True})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("window", [
+    "from=2030-11-01T00:00:00Z",
+    "to=2030-11-08T00:00:00%2B02:00",
+    "from=tomorrow",
+])
+def test_show_filters_reject_bad_datetimes(client, window):
+    assert client.get(f"/api/v1/shows?{window}").status_code == 400
+
+
+def test_show_filters_accept_local_datetimes(client):
+    response = client.get("/api/v1/shows?from=2030-11-01&to=2030-11-08T12:00")
+    assert response.status_code == 200
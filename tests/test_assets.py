@@ -0,0 +1,68 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from assets import build_assets, compressed, fingerprint, minify_css
+
+
+def test_fingerprint_names_the_content():
+    name = fingerprint("css/main.css", b"body{}")
+    assert name.startswith("css/main.") and name.endswith(".css")
+    assert len(name) == len("css/main..css") + 8
+    assert fingerprint("css/main.css", b"body{}") == name
+    assert fingerprint("css/main.css", b"body{ }") != name
+
+
+@pytest.mark.parametrize("css, minified", [
+    ("a {\n  color: red;\n}\n", "a{color:red}"),
+    ("/* note */\nb { margin: 0 }", "b{margin:0}"),
+    ("h1 , h2 > span { x: 1 }", "h1,h2>span{x:1}"),
+    # A space before a colon is a descendant combinator.
+    ("div :hover { x: 1 }", "div :hover{x:1}"),
+    ('a::after { content: "  /* kept */  " }',
+     'a::after{content:"  /* kept */  "}'),
+    ("/*! Bootstrap | MIT */\na { x: 1 }", "/*! Bootstrap | MIT */ a{x:1}"),
+    ("a { x: 1 }\n/*!\n * licence\n */", "a{x:1}/*!\n * licence\n */"),
+])
+def test_minify_css(css, minified):
+    assert minify_css(css) == minified
+
+
+def test_compressed_keeps_variants_worth_it():
+    content = b"body { color: red; }\n" * 100
+    variants = compressed(content)
+    assert gzip.decompress(variants[".gz"]) == content
+    # Already compressed data would not shrink enough.
+    assert compressed(os.urandom(4096)) == {}
+
+
+def test_compressed_builds_brotli_when_installed():
+    brotli = pytest.importorskip("brotli")
+    content = b"body { color: red; }\n" * 100
+    assert brotli.decompress(compressed(content)[".br"]) == content
+
+
+def test_build_assets(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "img").mkdir()
+    (tmp_path / "img" / "logo.png").write_bytes(b"\x89PNG")
+    (tmp_path / "css" / "main.css").write_text(
+        "/*! licence */\nbody {\n  background: url('../img/logo.png');\n}\n"
+        + "p { color: red; }\n" * 100)
+    built = {name: (hashed, variants)
+             for name, hashed, _, _, variants in build_assets(str(tmp_path))}
+    dist = tmp_path / "dist"
+    manifest = json.loads((dist / "manifest.json").read_text())
+    assert manifest == {name: hashed for name, (hashed, _) in built.items()}
+
+    logo, css = manifest["img/logo.png"], manifest["css/main.css"]
+    assert built["img/logo.png"][1] == {}
+    content = (dist / css).read_bytes()
+    assert css == fingerprint("css/main.css", content)
+    assert content.startswith(b"/*! licence */ body{background:url(")
+    assert f'url("../{logo}")'.encode() in content
+    gz = (dist / css).with_name(os.path.basename(css) + ".gz")
+    assert gzip.decompress(gz.read_bytes()) == content
+    assert built["css/main.css"][1][".gz"] == gz.stat().st_size
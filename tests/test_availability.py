@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from availability import conflicts, free_slots
+from models import db, Venue, Artist, Show
+
+DAY = datetime(2031, 3, 1)
+HOURS = timedelta(hours=1)
+DURATION = 3 * HOURS
+
+
+@pytest.fixture
+def booked(app):
+    """ A venue, an artist and a second venue; nothing is committed."""
+    with app.app_context():
+        venue, other = Venue(name="Free Slots"), Venue(name="Elsewhere")
+        artist = Artist(name="Free Slots")
+        db.session.add_all([venue, other, artist])
+        db.session.flush()
+
+        def book(at, venue=venue, artist=artist):
+            db.session.add(Show(venue_id=venue.id, artist_id=artist.id,
+                                start_time=at))
+            db.session.flush()
+
+        yield venue.id, other.id, artist.id, book
+        db.session.rollback()
+
+
+def slots(venue_id, start, end, **kwargs):
+    return free_slots(venue_id, start, end, duration=DURATION, **kwargs)
+
+
+def test_empty_window(booked):
+    venue_id, _, _, _ = booked
+    assert slots(venue_id, DAY, DAY + 12 * HOURS) == [(DAY, DAY + 12 * HOURS)]
+    # Too short for a show.
+    assert slots(venue_id, DAY, DAY + 2 * HOURS) == []
+
+
+def test_a_show_splits_the_window(booked):
+    venue_id, _, _, book = booked
+    book(DAY + 8 * HOURS)
+    assert slots(venue_id, DAY, DAY + 14 * HOURS) == [
+        (DAY, DAY + 8 * HOURS), (DAY + 11 * HOURS, DAY + 14 * HOURS)]
+
+
+def test_slot_boundaries(booked):
+    venue_id, _, _, book = booked
+    book(DAY + 3 * HOURS)
+    book(DAY + 9 * HOURS)
+    # A gap of exactly one show is free; a show starting at `end` is outside.
+    assert slots(venue_id, DAY + 3 * HOURS, DAY + 9 * HOURS) == [
+        (DAY + 6 * HOURS, DAY + 9 * HOURS)]
+    # A gap one minute short is not.
+    book(DAY + 6 * HOURS + timedelta(minutes=1))
+    assert slots(venue_id, DAY + 3 * HOURS, DAY + 9 * HOURS) == []
+
+
+def test_shows_before_the_window_overlap_it(booked):
+    venue_id, _, _, book = booked
+    start, end = DAY + 12 * HOURS, DAY + 18 * HOURS
+    book(start - DURATION)          # ends as the window starts
+    assert slots(venue_id, start, end) == [(start, end)]
+    book(start - DURATION + timedelta(minutes=30))
+    assert slots(venue_id, start, end) == [
+        (start + timedelta(minutes=30), end)]
+
+
+def test_artist_shows_elsewhere_count_when_given(booked):
+    venue_id, other_id, artist_id, book = booked
+    book(DAY + 8 * HOURS, venue=db.session.get(Venue, other_id))
+    window = (DAY + 6 * HOURS, DAY + 12 * HOURS)
+    assert slots(venue_id, *window) == [window]
+    assert slots(venue_id, *window, artist_id=artist_id) == []
+
+
+def test_conflicts_within_the_duration(booked):
+    venue_id, other_id, artist_id, book = booked
+    book(DAY)
+    assert conflicts(venue_id, None, DAY + DURATION, DURATION) == []
+    assert len(conflicts(venue_id, None, DAY + 2 * HOURS, DURATION)) == 1
+    assert len(conflicts(other_id, artist_id, DAY - 2 * HOURS, DURATION)) == 1
+    assert conflicts(other_id, None, DAY, DURATION) == []
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+from flask import Flask, g
+
+import cache
+from cache import MemoryBackend, PageCache
+
+
+def test_memory_backend_evicts_the_least_recently_used():
+    backend = MemoryBackend(maxsize=2)
+    backend.set("a", b"A", 60, [])
+    backend.set("b", b"B", 60, [])
+    assert backend.get("a") == b"A"     # "b" is now the oldest
+    backend.set("c", b"C", 60, [])
+    assert backend.get("b") is None
+    assert backend.get("a") == b"A"
+    assert backend.get("c") == b"C"
+
+
+def test_memory_backend_entries_expire(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now.value)
+    backend = MemoryBackend(maxsize=10)
+    backend.set("a", b"A", 30, ["venues"])
+    now.value += 30
+    assert backend.get("a") == b"A"
+    now.value += 1
+    assert backend.get("a") is None
+    # The expired entry is gone from its tags too.
+    assert backend.invalidate(["venues"]) == 0
+
+
+def test_memory_backend_invalidates_by_tag():
+    backend = MemoryBackend(maxsize=10)
+    backend.set("/venues?", b"list", 60, ["venues"])
+    backend.set("/venues/1?", b"one", 60, ["venues", "venue:1"])
+    backend.set("/venues/2?", b"two", 60, ["venues", "venue:2"])
+    assert backend.invalidate(["venue:1"]) == 1
+    assert backend.get("/venues/1?") is None
+    assert backend.get("/venues/2?") == b"two"
+    assert backend.invalidate(["venues", "venue:2"]) == 2
+    assert backend.get("/venues?") is None
+    assert backend.get("/venues/2?") is None
+    assert backend.invalidate(["venues"]) == 0
+
+
+def test_memory_backend_replaces_the_tags_of_a_key():
+    backend = MemoryBackend(maxsize=10)
+    backend.set("k", b"old", 60, ["old"])
+    backend.set("k", b"new", 60, ["new"])
+    assert backend.invalidate(["old"]) == 0
+    assert backend.get("k") == b"new"
+
+
+def test_key_sorts_the_query_string():
+    app = Flask(__name__)
+    with app.test_request_context("/venues?state=NY&genre=Jazz&genre=Blues"):
+        key = PageCache.key()
+    with app.test_request_context("/venues?genre=Blues&state=NY&genre=Jazz"):
+        assert PageCache.key() == key
+    assert key == "/venues?genre=Blues&genre=Jazz&state=NY"
+
+
+def test_cached_pages_are_served_until_invalidated():
+    app = Flask(__name__)
+    app.secret_key = "test"
+    app.config.update(CACHE_TYPE="memory", CACHE_TTL=60, CACHE_MAXSIZE=10)
+    page_cache = PageCache(app)
+    renders = []
+
+    @app.route("/venues/<int:venue_id>")
+    @page_cache.cached("venues", "venue:{venue_id}")
+    def show_venue(venue_id):
+        renders.append(venue_id)
+        return f"venue {venue_id}"
+
+    client = app.test_client()
+    for _ in range(2):
+        assert client.get("/venues/1").data == b"venue 1"
+    assert renders == [1]
+    assert page_cache.stats()["hits"] == 1
+    page_cache.invalidate("venue:2")
+    client.get("/venues/1")
+    assert renders == [1]
+    page_cache.invalidate("venue:1")
+    client.get("/venues/1")
+    assert renders == [1, 1]
+
+
+def test_key_holds_the_version_of_conditional_pages():
+    app = Flask(__name__)
+    with app.test_request_context("/venues/1"):
+        unversioned = PageCache.key()
+        g.version_tag = "2026-10-17T10:00:00"
+        old = PageCache.key()
+        g.version_tag = "2026-10-17T11:00:00"
+        new = PageCache.key()
+    assert unversioned == "/venues/1?"
+    assert len({unversioned, old, new}) == 3
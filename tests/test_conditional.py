@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.mark.parametrize("path", ["/venues", "/artists", "/shows"])
+def test_listings_have_no_last_modified(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers.get("ETag")
+    assert "Last-Modified" not in response.headers
+    since = client.get(path, headers={
+        "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert since.status_code == 200
+
+
+def test_listing_etag_answers_304(client):
+    etag = client.get("/venues").headers["ETag"]
+    assert client.get("/venues", headers={"If-None-Match": etag}).status_code == 304
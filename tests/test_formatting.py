@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import pytest
+
+from formatting import compiled_pattern, format_datetime
+
+SHOW = datetime(2026, 11, 6, 20, 30)
+
+
+@pytest.mark.parametrize("format, formatted", [
+    ("full", "Friday November, 6, 2026 at 8:30PM"),
+    ("medium", "Fri 11, 06, 2026 8:30PM"),
+    ("yyyy-MM-dd HH:mm", "2026-11-06 20:30"),
+])
+def test_format_datetime(format, formatted):
+    assert format_datetime(SHOW, format) == formatted
+
+
+def test_strings_are_parsed():
+    assert format_datetime("2026-11-06 20:30:00") == format_datetime(SHOW)
+
+
+def test_cldr_formats_are_left_to_babel():
+    import babel.dates
+    assert format_datetime(SHOW, "short") == babel.dates.format_datetime(
+        SHOW, "short", locale="en")
+
+
+def test_patterns_are_compiled_once():
+    compiled_pattern.cache_clear()
+    for _ in range(3):
+        format_datetime(SHOW, "full")
+    format_datetime(SHOW, "full", locale="fr")
+    info = compiled_pattern.cache_info()
+    assert (info.misses, info.hits) == (2, 2)
+    assert compiled_pattern("full", "en") is compiled_pattern("full", "en")
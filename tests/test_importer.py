@@ -0,0 +1,38 @@
+from importer import KINDS, import_rows
+from rules import MAX_ID
+
+
+def rows(*dicts):
+    return ((line, row, None) for line, row in enumerate(dicts, 1))
+
+
+def test_invalid_rows_are_rejected_one_by_one(app):
+    venue = {"name": "Hall", "city": "Austin", "state": "TX",
+             "address": "1 Main St", "genres": ["Jazz"],
+             "phone": "512-555-1234", "facebook_link": "https://www.facebook.com/hall"}
+    with app.app_context():
+        result = import_rows(KINDS["venues"], rows(
+            dict(venue, phone=5125551234),
+            dict(venue, seeking_talent="maybe"),
+            dict(venue, genres="Jazz,Polka"),
+            dict(venue, city="x" * 121),
+        ), chunk_size=10)
+    assert result.inserted == result.updated == 0
+    assert [(line, list(errors)) for line, errors in result.rejects] == [
+        (1, ["phone"]), (2, ["seeking_talent"]), (3, ["genres"]), (4, ["city"])]
+
+
+def test_show_start_time_accepts_iso_format(app):
+    show = {"venue_id": MAX_ID, "artist_id": MAX_ID}
+    with app.app_context():
+        result = import_rows(KINDS["shows"], rows(
+            dict(show, start_time="2030-05-21T21:30:00"),
+            dict(show, start_time=20300521),
+            dict(show, start_time="2030-05-21T21:30:00+02:00"),
+            dict(show, start_time="2030-05-21 21:30:00", venue_id=MAX_ID + 1),
+        ), chunk_size=10)
+    assert result.inserted == 0
+    # The first row is valid, and only rejected for its missing venue.
+    assert sorted((line, sorted(errors)) for line, errors in result.rejects) == [
+        (1, ["venue_id"]), (2, ["start_time"]), (3, ["start_time"]),
+        (4, ["venue_id"])]
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from app import create_app
+from instrumentation import instrumentation
+from models import db
+
+
+def make_app(app, **settings):
+    return create_app(SimpleNamespace(**dict(app.config, **settings)))
+
+
+@pytest.mark.parametrize("path", ["/debug/timings", "/pool/status",
+                                  "/cache/stats"])
+def test_debug_endpoints_need_instrumentation(app, path):
+    hidden = make_app(app, INSTRUMENTATION=False, DEBUG=False)
+    shown = make_app(app, INSTRUMENTATION=True)
+    assert hidden.test_client().get(path).status_code == 404
+    assert shown.test_client().get(path).status_code == 200
+
+
+def test_engine_listeners_are_registered_once(app):
+    instrumented = make_app(app, INSTRUMENTATION=True)
+    with instrumented.app_context():
+        engine = db.engine
+        instrumentation.init_app(instrumented, db)
+        listeners = engine.dispatch.before_cursor_execute
+        assert len(listeners) == 1
+
+
+def test_failed_statement_leaves_no_query_start(app):
+    instrumented = make_app(app, INSTRUMENTATION=True)
+    with instrumented.app_context():
+        with db.engine.connect() as connection:
+            with pytest.raises(ProgrammingError):
+                connection.execute(text("SELECT * FROM no_such_table"))
+            assert not connection.info.get("query_start")
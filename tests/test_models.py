@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import selectinload
+
+from models import db, Venue
+
+
+def test_lazy_loads_raise(app):
+    with app.app_context():
+        venue = db.session.scalars(db.select(Venue).limit(1)).first()
+        if venue is None:
+            pytest.skip("No venues")
+        with pytest.raises(InvalidRequestError):
+            venue.shows
+
+
+def test_eager_loads_do_not_raise(app):
+    with app.app_context():
+        venue = db.session.scalars(
+            db.select(Venue).options(selectinload(Venue.shows)).limit(1)).first()
+        if venue is None:
+            pytest.skip("No venues")
+        assert isinstance(venue.shows, list)
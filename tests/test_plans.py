@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import text
+
+from models import db, Venue, Artist
+from plans import busiest, check_plans, seq_scans
+
+
+def test_seq_scans():
+    plan = {"Node Type": "Nested Loop", "Plans": [
+        {"Node Type": "Seq Scan", "Relation Name": "Show"},
+        {"Node Type": "Index Scan", "Relation Name": "Venue", "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "Artist"}]},
+    ]}
+    assert seq_scans(plan) == ["Show", "Artist"]
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        if busiest(Venue) is None or busiest(Artist) is None:
+            pytest.skip("the test database has no venues or artists")
+        # The test tables are small enough that PostgreSQL would rightly
+        # scan them; with seq scans off, one remains only where no index
+        # can serve the query. check_plans rolls the setting back.
+        db.session.execute(text("SET LOCAL enable_seqscan = off"))
+        failures = [(name, scanned) for name, _, scanned in check_plans()
+                    if scanned]
+    assert failures == []
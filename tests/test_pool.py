@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app import create_app
+from models import db
+from pool import MonitoredQueuePool, percentile, pool_stats
+
+ENGINE_OPTIONS = {"pool_size": 2, "max_overflow": 1, "pool_timeout": 7,
+                  "pool_recycle": 60, "pool_pre_ping": True}
+
+
+def make_app(app, **settings):
+    return create_app(SimpleNamespace(**dict(app.config, **settings)))
+
+
+def statement_timeout():
+    return db.session.execute(text("SHOW statement_timeout")).scalar()
+
+
+def test_percentile():
+    assert percentile([], 0.5) is None
+    assert percentile([3, 1, 2], 0.5) == 2
+    assert percentile(list(range(100)), 0.95) == 95
+    assert percentile([1, 2], 1.0) == 2
+
+
+def test_engine_uses_the_configured_pool(app):
+    pooled = make_app(app, SQLALCHEMY_ENGINE_OPTIONS=dict(ENGINE_OPTIONS))
+    with pooled.app_context():
+        pool = db.engine.pool
+        assert isinstance(pool, MonitoredQueuePool)
+        assert pool.size() == 2
+        assert pool._max_overflow == 1
+        assert pool._timeout == 7
+        assert pool._recycle == 60
+        assert pool._pre_ping
+
+
+def test_checkouts_are_recorded(app):
+    with app.app_context():
+        checkouts = pool_stats.checkouts
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        assert pool_stats.checkouts == checkouts + 1
+        assert pool_stats.held
+
+
+@pytest.mark.parametrize("path, timeout", [
+    ("/venues", "1234ms"),          # DB_STATEMENT_TIMEOUT
+    ("/artists", "5s"),             # STATEMENT_TIMEOUTS["artists.artists"]
+    ("/api/v1/venues/export", "0"),
+])
+def test_request_transactions_set_a_statement_timeout(app, path, timeout):
+    timed = make_app(app, DB_STATEMENT_TIMEOUT=1234, STATEMENT_TIMEOUTS={
+        "artists.artists": 5000, "api.export": 0})
+    with timed.test_request_context(path):
+        assert statement_timeout() == timeout
+        db.session.rollback()
+
+
+def test_statement_timeout_is_local_to_the_transaction(app):
+    # One pooled connection, so the engine checks out the session's one.
+    timed = make_app(app, DB_STATEMENT_TIMEOUT=1234,
+                     SQLALCHEMY_ENGINE_OPTIONS={"pool_size": 1,
+                                                "max_overflow": 0})
+    with timed.test_request_context("/venues"):
+        assert statement_timeout() == "1234ms"
+        db.session.commit()
+        with db.engine.connect() as connection:
+            assert connection.exec_driver_sql(
+                "SHOW statement_timeout").scalar() != "1234ms"
+
+
+def test_cli_transactions_have_no_statement_timeout(app):
+    timed = make_app(app, DB_STATEMENT_TIMEOUT=1234)
+    with timed.app_context():
+        assert statement_timeout() != "1234ms"
+        db.session.rollback()
+
+
+def test_pool_status(app):
+    instrumented = make_app(app, INSTRUMENTATION=True,
+                            SQLALCHEMY_ENGINE_OPTIONS=dict(ENGINE_OPTIONS))
+    client = instrumented.test_client()
+    client.get("/venues")
+    status = client.get("/pool/status").get_json()
+    assert status["pool"] == "MonitoredQueuePool"
+    assert status["size"] == 2
+    assert status["checked_out"] == 0
+    assert status["checkouts"] >= 1
+    assert set(status) == {"pool", "size", "checked_in", "checked_out",
+                           "overflow", "checkouts", "timeouts", "wait",
+                           "held"}
+    for timings in (status["wait"], status["held"]):
+        assert set(timings) == {"p50_ms", "p95_ms", "max_ms"}
+        assert timings["max_ms"] >= timings["p50_ms"] >= 0
@@ -0,0 +1,54 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from models import Venue, Show
+from queries import decode_cursor, encode_cursor
+
+
+def raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def test_cursor_round_trip():
+    values = (datetime(2026, 11, 1, 20, 30), 42)
+    columns = [Show.start_time, Show.id]
+    assert decode_cursor(encode_cursor(values), columns) == values
+
+
+@pytest.mark.parametrize("values", [
+    ["a"],            # str for an integer column
+    [True],           # bool is not an id
+    [1.5],
+    [[1]],
+    [1, 2],           # wrong length
+])
+def test_decode_cursor_rejects_wrong_types(values):
+    with pytest.raises(ValueError):
+        decode_cursor(raw_cursor(values), [Venue.id])
+
+
+@pytest.mark.parametrize("values", [
+    [1, 2],                     # int for a datetime
+    ["not a date", 2],
+    ["2026-11-01T20:00:00", "2"],
+])
+def test_decode_cursor_rejects_bad_datetimes(values):
+    with pytest.raises(ValueError):
+        decode_cursor(raw_cursor(values), [Show.start_time, Show.id])
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("!!not base64!!", [Venue.id])
+
+
+@pytest.mark.parametrize("path", [
+    f"/artists?after={raw_cursor(['a'])}",
+    f"/shows?after={raw_cursor([1, 2])}",
+    f"/api/v1/venues?after={raw_cursor(['a'])}",
+])
+def test_bad_cursor_is_a_bad_request(client, path):
+    assert client.get(path).status_code == 400
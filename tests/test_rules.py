@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+
+from rules import ARTIST_RULES, SHOW_RULES, VENUE_RULES, is_valid_phone
+
+ARTIST = {"name": "The Band", "city": "Austin", "state": "TX",
+          "phone": "512-555-1234", "genres": ["Jazz", "Folk"],
+          "facebook_link": "https://www.facebook.com/theband"}
+
+
+def test_valid_artist():
+    values, errors = ARTIST_RULES.validate(ARTIST)
+    assert errors == {}
+    assert values["seeking_venue"] is False
+    assert values["website_link"] == ""
+
+
+@pytest.mark.parametrize("number", ["1234567890", "123.456.7890",
+                                    "123-456-7890", "123 456 7890",
+                                    "(123) 456-7890"])
+def test_valid_phones(number):
+    assert is_valid_phone(number)
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("name", "", "This field is required."),
+    ("state", "XX", "Invalid state."),
+    ("genres", ["Jazz", "Polka"], "Invalid genres."),
+    ("phone", "555-1234", "Invalid phone format (should be xxx-xxx-xxxx)."),
+    ("facebook_link", "not a url", "Invalid URL."),
+    ("city", "x" * 121, "Field cannot be longer than 120 characters."),
+])
+def test_rule_errors(field, value, message):
+    _, errors = ARTIST_RULES.validate(dict(ARTIST, **{field: value}))
+    assert errors == {field: [message]}
+
+
+@pytest.mark.parametrize("field, value", [
+    ("name", 42),
+    ("phone", 5125551234),
+    ("genres", [1]),
+    ("genres", {"Jazz": True}),
+    ("seeking_venue", 1),
+    ("seeking_venue", "maybe"),
+])
+def test_type_errors_are_the_only_error_of_a_field(field, value):
+    _, errors = ARTIST_RULES.validate(dict(ARTIST, **{field: value}))
+    assert list(errors) == [field]
+    assert len(errors[field]) == 1
+
+
+@pytest.mark.parametrize("value, expected", [
+    (True, True), (False, False), (None, False),
+    ("true", True), ("False", False), ("", False),
+])
+def test_booleans(value, expected):
+    row = dict(ARTIST, genres="Jazz", seeking_venue=value)
+    values, errors = ARTIST_RULES.validate(row)
+    assert errors == {}
+    assert values["seeking_venue"] is expected
+    assert values["genres"] == ["Jazz"]
+
+
+def test_venue_requires_address():
+    _, errors = VENUE_RULES.validate(ARTIST)
+    assert errors == {"address": ["This field is required."]}
+
+
+@pytest.mark.parametrize("start_time", [
+    "2030-05-21 21:30:00", "2030-05-21T21:30:00", datetime(2030, 5, 21, 21, 30),
+])
+def test_show_start_times(start_time):
+    values, errors = SHOW_RULES.validate(
+        {"artist_id": "1", "venue_id": 2, "start_time": start_time})
+    assert errors == {}
+    assert values == {"artist_id": 1, "venue_id": 2,
+                      "start_time": datetime(2030, 5, 21, 21, 30)}
+
+
+@pytest.mark.parametrize("row, fields", [
+    ({"start_time": "tomorrow"}, ["start_time"]),
+    ({"start_time": "2030-05-21T21:30:00+02:00"}, ["start_time"]),
+    ({"start_time": 1}, ["start_time"]),
+    ({"start_time": ""}, ["start_time"]),
+    ({"artist_id": "one"}, ["artist_id"]),
+    ({"artist_id": True}, ["artist_id"]),
+    ({"artist_id": 0}, ["artist_id"]),
+    ({"artist_id": 2 ** 31}, ["artist_id"]),
+])
+def test_show_errors(row, fields):
+    row = dict({"artist_id": 1, "venue_id": 2,
+                "start_time": "2030-05-21 21:30:00"}, **row)
+    _, errors = SHOW_RULES.validate(row)
+    assert sorted(errors) == fields
+
+
+def test_validate_many():
+    results = list(SHOW_RULES.validate_many(
+        [{"artist_id": 1, "venue_id": 2, "start_time": "2030-05-21 21:30:00"},
+         {"artist_id": 1, "venue_id": 2}]))
+    assert [errors for _, errors in results] == [
+        {}, {"start_time": ["This field is required."]}]
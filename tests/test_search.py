@@ -0,0 +1,29 @@
+from models import Venue
+from search import name_prefix_pattern, search, to_prefix_query
+
+
+def test_to_prefix_query():
+    assert to_prefix_query("New  Ro") == "new:* & ro:*"
+    assert to_prefix_query("rock'n'roll!") == "rock:* & n:* & roll:*"
+    assert to_prefix_query(" &|!: ") is None
+
+
+def test_name_prefix_pattern_escapes_like_wildcards():
+    assert name_prefix_pattern(" Ab ") == "ab%"
+    assert name_prefix_pattern("5%_\\") == "5\\%\\_\\\\%"
+
+
+def test_short_terms_match_name_prefixes(app):
+    with app.app_context():
+        hits = search(Venue, "t")
+    names = [hit.name.lower() for hit in hits]
+    assert all(name.startswith("t") for name in names)
+    assert names == sorted(names, key=lambda name: name.encode())
+
+
+def test_search_ranks_the_window(app, monkeypatch):
+    monkeypatch.setitem(app.config, "SEARCH_RANK_WINDOW", 10 ** 6)
+    with app.app_context():
+        everything = search(Venue, "the", limit=10 ** 6)
+        best = search(Venue, "the", limit=3)
+    assert best == everything[:3]
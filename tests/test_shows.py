@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.mark.parametrize("window", [
+    "from=2030-11-01T00:00:00Z&to=2030-11-08",
+    "from=2030-11-01&to=2030-11-08T00:00:00%2B02:00",
+    "from=2030-11-08&to=2030-11-01",
+    "from=tomorrow&to=2030-11-08",
+    "to=2030-11-08",
+])
+def test_availability_rejects_bad_windows(client, window):
+    assert client.get(f"/availability?venue_id=1&{window}").status_code == 400
@@ -0,0 +1,39 @@
+from urllib.parse import parse_qs, urlsplit
+
+from flask import Flask
+
+from views import page_url
+
+
+def make_app():
+    app = Flask(__name__)
+    app.add_url_rule("/venues", "venues", lambda: "")
+    app.add_url_rule("/venues/<int:venue_id>", "show_venue", lambda venue_id: "")
+    return app
+
+
+def query(url):
+    return parse_qs(urlsplit(url).query)
+
+
+def test_page_url_keeps_repeated_filters():
+    with make_app().test_request_context(
+            "/venues?genre=Jazz&genre=Blues&state=CA&after=old"):
+        url = page_url(after="new")
+    assert query(url) == {"genre": ["Jazz", "Blues"], "state": ["CA"],
+                          "after": ["new"]}
+
+
+def test_page_url_replaces_only_its_prefix():
+    with make_app().test_request_context(
+            "/venues/1?past_after=a&upcoming_after=b"):
+        url = page_url("past_", before="c")
+    assert urlsplit(url).path == "/venues/1"
+    assert query(url) == {"upcoming_after": ["b"], "past_before": ["c"]}
+
+
+def test_page_url_ignores_view_args_and_url_for_options():
+    with make_app().test_request_context(
+            "/venues/1?venue_id=5&_external=1&_anchor=x&_scheme=ftp&past_after=a"):
+        url = page_url("past_", after="b")
+    assert url == "/venues/1?past_after=b"
@@ -0,0 +1,134 @@
+""" Venue pages: listing, search, detail, create, edit and delete."""
+from flask import Blueprint, abort, flash, render_template, request
+
+from cache import page_cache
+from conditional import conditional
+from dto import detail, detail_row
+from edits import edit_row
+from models import db, Venue, Artist, Show
+from queries import (
+    browse_args,
+    entity_version,
+    show_counts,
+    show_history,
+    venue_areas,
+)
+from search import search
+from views import delete_entity, flash_errors, paginate, render_search, submit_edit
+
+venue_pages = Blueprint("venues", __name__)
+
+
+@venue_pages.route("/venues")
+@conditional(lambda: paginate(venue_areas, version=True, **browse_args(request.args)))
+@page_cache.cached("venues")
+def venues():
+    page = paginate(venue_areas, **browse_args(request.args))
+    return render_venues(page)
+
+
+def render_venues(page):
+    return render_template("pages/venues.html", areas=page.items, page=page)
+
+
+# Route to search for venues based on search term
+@venue_pages.route("/venues/search", methods=["POST"])
+def search_venues():
+    search_term = request.form.get("search_term", "")
+    return render_search("pages/search_venues.html", search_term,
+                         search(Venue, search_term))
+
+
+@venue_pages.route("/venues/<int:venue_id>")
+@conditional(lambda venue_id: entity_version(Venue, venue_id))
+@page_cache.cached("venue:{venue_id}")
+def show_venue(venue_id):
+    # shows the venue page with the given venue_id
+    venue = detail_row(Venue, venue_id)
+    if venue is None:
+        abort(404)
+    upcoming_page = paginate(show_history, "upcoming_", fk=Show.venue_id,
+                             entity_id=venue_id, counterpart=Artist, upcoming=True)
+    past_page = paginate(show_history, "past_", fk=Show.venue_id,
+                         entity_id=venue_id, counterpart=Artist, upcoming=False)
+    counts = show_counts(Show.venue_id, venue_id)
+    return render_venue(venue, upcoming_page, past_page, counts)
+
+
+def render_venue(venue, upcoming_page, past_page, counts):
+    data = detail(Venue, venue, upcoming_page, past_page, counts)
+    return render_template("pages/show_venue.html", venue=data,
+                           upcoming_page=upcoming_page, past_page=past_page)
+
+# 	Create Venue
+# 	----------------------------------------------------------------
+
+
+@venue_pages.route("/venues/create", methods=["GET"])
+def create_venue_form():
+    # WTForms is imported by the form pages only.
+    from forms import VenueForm
+    form = VenueForm()
+    return render_template("forms/new_venue.html", form=form)
+
+
+@venue_pages.route("/venues/create", methods=["POST"])
+def create_venue_submission():
+    from forms import VenueForm
+    # Set the FlaskForm
+    form = VenueForm(request.form, meta={'csrf': False})
+    # Validate all fields
+    if form.validate():
+        try:
+            venue = Venue(
+                name=form.name.data,
+                city=form.city.data,
+                state=form.state.data,
+                address=form.address.data,
+                phone=form.phone.data,
+                genres=form.genres.data,
+                image_link=form.image_link.data,
+                facebook_link=form.facebook_link.data,
+                website=form.website_link.data,
+                seeking_talent=form.seeking_talent.data,
+                seeking_description=form.seeking_description.data,
+            )
+            db.session.add(venue)
+            db.session.commit()
+            page_cache.invalidate("venues")
+            flash('Venue ' + request.form['name'] +
+                  ' was successfully listed!')
+        except ValueError as e:
+            print(e)
+            db.session.rollback()
+            flash("An error occurred. Venue " +
+                  request.form["name"] + " could not be listed.")
+        finally:
+            db.session.close()
+
+        return render_template("pages/home.html")
+    else:
+        flash_errors(form)
+        return render_template('forms/new_venue.html', form=form)
+
+
+@venue_pages.route("/venues/<int:venue_id>/edit", methods=["GET"])
+def edit_venue(venue_id):
+    from forms import VenueForm
+    venue = edit_row(Venue, venue_id)
+    if venue is None:
+        abort(404)
+    form = VenueForm(obj=venue)
+    return render_template("forms/edit_venue.html", form=form, venue=venue)
+
+
+@venue_pages.route("/venues/<int:venue_id>/edit", methods=["POST"])
+def edit_venue_submission(venue_id):
+    from forms import VenueForm
+    form = VenueForm(request.form, meta={'csrf': False})
+    return submit_edit(Venue, venue_id, form)
+
+
+@venue_pages.route("/venues/<int:venue_id>", methods=["DELETE"])
+def delete_venue(venue_id):
+    return delete_entity(Venue, venue_id)
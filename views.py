@@ -0,0 +1,119 @@
+""" Helpers shared by the venue, artist and show pages.
+
+The pages themselves are the `venues`, `artists` and `shows` blueprints
+(venues.py, artists.py, shows.py), registered by app.create_app.
+"""
+from flask import (
+    abort,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+
+from deletes import delete_entities, invalidate_deleted
+from dto import SearchHit, rows_to
+from edits import EditConflict, changes, edit_row, invalidate_edited, save_edit
+from models import db
+
+
+def paginate(listing, prefix="", **kwargs):
+    """ Call a keyset listing with the cursor and page size from the query
+    string. `prefix` tells apart several paginated lists on one page."""
+    try:
+        return listing(
+            after=request.args.get(f"{prefix}after"),
+            before=request.args.get(f"{prefix}before"),
+            per_page=request.args.get("per_page", type=int),
+            **kwargs
+        )
+    except ValueError:
+        abort(400)
+
+
+def page_url(prefix="", **cursors):
+    """ URL of the current page with the `prefix` cursor replaced."""
+    # A MultiDict, so that repeated filters (genre=...&genre=...) are kept.
+    args = request.args.copy()
+    args.pop(f"{prefix}after", None)
+    args.pop(f"{prefix}before", None)
+    for key, value in cursors.items():
+        args[f"{prefix}{key}"] = value
+    # Query keys naming a view arg or a url_for option (_external, ...)
+    # would clash with them, or let the query string steer url_for.
+    args = {key: values for key, values in args.to_dict(flat=False).items()
+            if key not in request.view_args and not key.startswith("_")}
+    return url_for(request.endpoint, **request.view_args, **args)
+
+
+def flash_errors(form):
+    message = []
+    for field, errors in form.errors.items():
+        for error in errors:
+            message.append(f"{field}: {error}")
+    flash('Please fix the following errors: ' + ', '.join(message))
+
+
+def render_search(template, search_term, rows):
+    response = {
+        "count": len(rows),
+        "data": rows_to(SearchHit, rows),
+    }
+    return render_template(template, results=response, search_term=search_term)
+
+
+def submit_edit(model, entity_id, form):
+    # One UPDATE of the changed columns, checked against the version the
+    # form was read at, see edits.py.
+    name = model.__name__
+    template = f"forms/edit_{name.lower()}.html"
+    row = edit_row(model, entity_id)
+    if row is None:
+        abort(404)
+    if not form.validate():
+        flash_errors(form)
+        return render_template(template, form=form, **{name.lower(): row})
+    try:
+        version = form.version.data and int(form.version.data)
+        if version != row.version:
+            raise EditConflict(row.version)
+        values = changes(model, row, form.data)
+        if values:
+            edited = save_edit(model, entity_id, version, values)
+            db.session.commit()
+            invalidate_edited(model, entity_id, edited)
+        flash(f'{name} {form.name.data} was successfully updated!')
+    except EditConflict as conflict:
+        db.session.rollback()
+        # Submitting again overwrites the other edit.
+        form.version.data = conflict.version
+        flash(f'{name} {row.name} was changed by someone else while you were '
+              f'editing it. Check the form and submit it again to overwrite.')
+        return render_template(template, form=form, **{name.lower(): row}), 409
+    except Exception as ex:
+        flash(f'An error occurred. {name} {entity_id} could not be updated.')
+        print(ex)
+        db.session.rollback()
+    finally:
+        db.session.close()
+    name = name.lower()
+    return redirect(url_for(f"{name}s.show_{name}", **{f"{name}_id": entity_id}))
+
+
+def delete_entity(model, entity_id):
+    # One DELETE; the shows go by ON DELETE CASCADE, see deletes.py.
+    name = model.__name__
+    try:
+        deleted = delete_entities(model, [entity_id])
+        db.session.commit()
+        invalidate_deleted(model, deleted)
+        if not deleted.ids:
+            flash(f"{name} {entity_id} does not exist.")
+    except Exception as ex:
+        flash(f"An error occurred. {name} {entity_id} could not be deleted.")
+        print(ex)
+        db.session.rollback()
+    finally:
+        db.session.close()
+    return render_template("pages/home.html")